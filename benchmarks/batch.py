@@ -0,0 +1,38 @@
+# Copyright (C) 2019-2022 Vanessa Sochat.
+
+# This Source Code Form is subject to the terms of the
+# Mozilla Public License, v. 2.0. If a copy of the MPL was not distributed
+# with this file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+# Measure pickling a manifest, and loading many manifests in a process pool.
+# python -m benchmarks.batch
+
+from opencontainers.image.v1 import Manifest
+from opencontainers.batch import load_many
+from benchmarks.utils import best, report
+from benchmarks import data
+
+import pickle
+
+
+def main():
+    manifest = Manifest().load(data.manifest(1, layers=10))
+    payload = pickle.dumps(manifest, protocol=pickle.HIGHEST_PROTOCOL)
+    print("%-40s %10d bytes" % ("manifest (10 layers) pickle", len(payload)))
+    report(
+        "manifest (10 layers) pickle round trip",
+        best(lambda: pickle.loads(pickle.dumps(manifest, pickle.HIGHEST_PROTOCOL))),
+    )
+
+    contents = [data.manifest(i, layers=10) for i in range(2000)]
+    serial = best(lambda: [Manifest().load(c) for c in contents], number=1, repeat=3)
+    report("2000 manifests load", serial)
+    report(
+        "2000 manifests load_many",
+        best(lambda: load_many(Manifest, contents), number=1, repeat=3),
+        serial,
+    )
+
+
+if __name__ == "__main__":
+    main()
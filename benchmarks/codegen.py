@@ -0,0 +1,75 @@
+# Copyright (C) 2019-2022 Vanessa Sochat.
+
+# This Source Code Form is subject to the terms of the
+# Mozilla Public License, v. 2.0. If a copy of the MPL was not distributed
+# with this file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+# Compare the generic and generated load, validate and to_dict.
+# python -m benchmarks.codegen
+
+from opencontainers.image.v1 import (
+    Descriptor,
+    Platform,
+    Manifest,
+    Index,
+    ImageConfig,
+    RootFS,
+    History,
+    Image,
+)
+from opencontainers import codegen
+from benchmarks.utils import best, report
+from benchmarks import data
+
+import time
+
+classes = [Descriptor, Platform, Manifest, Index, ImageConfig, RootFS, History, Image]
+
+
+def validate_time(index, manifests, repeat=5):
+    """
+    Return the best time to validate the corpus, made new for each run.
+    """
+    times = []
+    for _ in range(repeat):
+        structs = [Index.from_trusted_dict(index)]
+        structs += [Manifest.from_trusted_dict(m) for m in manifests]
+        start = time.perf_counter()
+        for struct in structs:
+            struct.validate()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def run(index, manifests):
+    """
+    Return the time to load, validate and to_dict the corpus.
+    """
+    loaded = [Manifest().load(m) for m in manifests]
+    return {
+        "load": best(
+            lambda: (Index().load(index), [Manifest().load(m) for m in manifests]),
+            number=3,
+        ),
+        "validate": validate_time(index, manifests),
+        "to_dict": best(lambda: [m.to_dict() for m in loaded], number=3),
+    }
+
+
+def main():
+    # An index of manifests, and the manifests (with 10 layers each)
+    index = data.index(manifests=1000)
+    manifests = [data.manifest(i, layers=10) for i in range(1000)]
+
+    codegen.uninstall(*classes)
+    generic = run(index, manifests)
+    codegen.install(*classes)
+    generated = run(index, manifests)
+
+    for name, seconds in generic.items():
+        report("corpus %s (generic)" % name, seconds)
+        report("corpus %s (generated)" % name, generated[name], seconds)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+# Copyright (C) 2019-2022 Vanessa Sochat.
+
+# This Source Code Form is subject to the terms of the
+# Mozilla Public License, v. 2.0. If a copy of the MPL was not distributed
+# with this file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+import hashlib
+
+# Realistic content to generate benchmark documents from
+
+MediaTypeImageManifest = "application/vnd.oci.image.manifest.v1+json"
+MediaTypeImageIndex = "application/vnd.oci.image.index.v1+json"
+MediaTypeImageConfig = "application/vnd.oci.image.config.v1+json"
+MediaTypeImageLayerGzip = "application/vnd.oci.image.layer.v1.tar+gzip"
+
+platforms = [
+    ("amd64", "linux", None),
+    ("arm64", "linux", "v8"),
+    ("arm", "linux", "v7"),
+    ("ppc64le", "linux", None),
+    ("s390x", "linux", None),
+]
+
+
+def digest(seed):
+    """Generate a (valid) sha256 digest from a seed"""
+    return "sha256:%s" % hashlib.sha256(str(seed).encode("utf-8")).hexdigest()
+
+
+def descriptor(seed, mediaType=MediaTypeImageLayerGzip, platform=None):
+    """Generate a descriptor dictionary"""
+    desc = {"mediaType": mediaType, "size": 1000 + seed, "digest": digest(seed)}
+    if platform:
+        arch, os, variant = platform
+        desc["platform"] = {"architecture": arch, "os": os}
+        if variant:
+            desc["platform"]["variant"] = variant
+    return desc
+
+
+def manifest(seed, layers=10):
+    """Generate an image manifest dictionary with some number of layers"""
+    return {
+        "schemaVersion": 2,
+        "config": descriptor(seed, MediaTypeImageConfig),
+        "layers": [descriptor(seed * 1000 + i) for i in range(layers)],
+        "annotations": {"org.opencontainers.image.ref.name": "v%s" % seed},
+    }
+
+
+def index(manifests=40):
+    """Generate an image index dictionary, with a platform for each entry"""
+    return {
+        "schemaVersion": 2,
+        "manifests": [
+            descriptor(i, MediaTypeImageManifest, platforms[i % len(platforms)])
+            for i in range(manifests)
+        ],
+    }
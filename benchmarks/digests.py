@@ -0,0 +1,105 @@
+# Copyright (C) 2019-2022 Vanessa Sochat.
+
+# This Source Code Form is subject to the terms of the
+# Mozilla Public License, v. 2.0. If a copy of the MPL was not distributed
+# with this file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+# Compare parsing digests (and reading their algorithm and encoded portion)
+# without the ParseDigest cache, as before, against repeat parses from it,
+# and validating the encoded portion with hashlib.new (as before) against the
+# algorithm registry. Last, verify a 64 MiB blob written in 64 KiB chunks,
+# making a digest for every chunk (as the verifier did before) or not.
+# python -m benchmarks.digests
+
+from opencontainers.digest import Algorithm, Digest, FromBytes, NewDigest, ParseDigest
+from opencontainers.digest.algorithm import anchoredEncodedRegexps, fullDigestRegexp
+from benchmarks.utils import best, report
+from benchmarks import data
+
+import hashlib
+
+count = 10000
+
+
+def uncached(string):
+    """
+    Parse and read a digest the way it was done before the cache.
+    """
+    d = Digest(string)
+    ParseDigest.__wrapped__(string)
+    return Algorithm(d[: d.sepIndex()]), d[d.startEncodedIndex() :]
+
+
+def cached(string):
+    d = Digest(string)
+    d.validate()
+    return d.algorithm, d.encoded()
+
+
+def validate_hashlib(algorithm, encoded):
+    """
+    Validate an encoded portion the way it was done before the registry.
+    """
+    name = fullDigestRegexp.search(algorithm)
+    name = name.group("algorithm") if name else algorithm
+    if hashlib.new(name).digest_size * 2 != len(encoded):
+        return False
+    return anchoredEncodedRegexps[name].search(encoded) is not None
+
+
+def verify_per_chunk(digest, chunks):
+    """
+    Verify chunks the way the verifier did before, with a digest per write.
+    """
+    verifier = digest.verifier()
+    for chunk in chunks:
+        verifier.hash.update(chunk)
+        NewDigest(digest.algorithm, verifier.hash).validate()
+    return verifier.verified()
+
+
+def verify(digest, chunks):
+    verifier = digest.verifier()
+    for chunk in chunks:
+        verifier.write(chunk)
+    return verifier.verified()
+
+
+def main():
+    # A few thousand digests, each seen a few times
+    digests = [data.digest(i) for i in range(count // 4)] * 4
+
+    previous = best(lambda: [uncached(d) for d in digests])
+    report("parse and access, no cache x%s" % count, previous)
+    report(
+        "parse and access, cached x%s" % count,
+        best(lambda: [cached(d) for d in digests]),
+        previous,
+    )
+
+    algorithm = Algorithm("sha256")
+    encoded = [d.split(":")[1] for d in digests]
+    previous = best(lambda: [validate_hashlib(algorithm, e) for e in encoded])
+    report("Algorithm.validate, hashlib.new x%s" % count, previous)
+    report(
+        "Algorithm.validate, registry x%s" % count,
+        best(lambda: [algorithm.validate(e) for e in encoded]),
+        previous,
+    )
+
+    size = 64 * 1024
+    blob = bytes(range(256)) * (size * 4)
+    view = memoryview(blob)
+    chunks = [view[i : i + size] for i in range(0, len(blob), size)]
+    digest = FromBytes(blob)
+    previous = best(lambda: verify_per_chunk(digest, chunks), number=1)
+    report("verify 64 MiB, digest per chunk", previous)
+    report(
+        "verify 64 MiB, hashVerifier",
+        best(lambda: verify(digest, chunks), number=1),
+        previous,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+# Copyright (C) 2019-2022 Vanessa Sochat.
+
+# This Source Code Form is subject to the terms of the
+# Mozilla Public License, v. 2.0. If a copy of the MPL was not distributed
+# with this file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+# Compare resolving short digests (the first 12 characters of the encoded
+# portion) by scanning a list of digests against a DigestSet lookup.
+# python -m benchmarks.digestset
+
+from opencontainers.digest import DigestSet
+from benchmarks.utils import best, report
+from benchmarks import data
+
+import time
+
+count = 200000
+lookups = 100
+
+
+def scan(digests, short):
+    """
+    Resolve a short digest the way it was done before, with a linear scan.
+    """
+    matches = [d for d in digests if d.split(":")[1].startswith(short)]
+    return matches[0] if len(matches) == 1 else None
+
+
+def main():
+    digests = [data.digest(i) for i in range(count)]
+    shorts = [d.split(":")[1][:12] for d in digests[:: count // lookups]]
+
+    start = time.perf_counter()
+    dset = DigestSet(digests)
+    report("DigestSet of %s digests, build" % count, time.perf_counter() - start)
+
+    previous = best(lambda: [scan(digests, s) for s in shorts], number=1, repeat=3)
+    report("linear scan x%s" % lookups, previous)
+    report(
+        "DigestSet.lookup x%s" % lookups,
+        best(lambda: [dset.lookup(s) for s in shorts]),
+        previous,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+# Copyright (C) 2019-2022 Vanessa Sochat.
+
+# This Source Code Form is subject to the terms of the
+# Mozilla Public License, v. 2.0. If a copy of the MPL was not distributed
+# with this file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+# Compare the throughput of digesting a 256 MiB file read into an io.BytesIO
+# (fromReader, as before) against fromStream (readinto a reused buffer) and
+# fromFile (memory mapped), and its sha256 and sha512 digests read twice or
+# in one pass with a multiDigester (the file is in the page cache here, so
+# this measures hashing, not the second read from disk that is saved). Then
+# digest 16 files of 32 MiB one at a time and with digest_many (which scales
+# with the number of cores). Last, resume digesting the file at 90%, from the
+# start (hashlib) or from a checkpoint (resumableDigester).
+# python -m benchmarks.files
+
+from opencontainers.digest import (
+    Canonical,
+    SHA512,
+    digest_many,
+    multiDigester,
+    resumableDigester,
+)
+from benchmarks.utils import best, report
+
+import io
+import os
+import tempfile
+
+size = 256 * 1024 * 1024
+
+
+def reader(path):
+    with open(path, "rb") as fd:
+        return Canonical.fromReader(io.BytesIO(fd.read()))
+
+
+def stream(path):
+    with open(path, "rb") as fd:
+        return Canonical.fromStream(fd)
+
+
+def twice(path):
+    with open(path, "rb") as fd:
+        sha512 = SHA512.fromStream(fd)
+    return [stream(path), sha512]
+
+
+def one_pass(path):
+    with open(path, "rb") as fd:
+        return multiDigester().readFrom(fd).digests()
+
+
+def resume(path, checkpoint):
+    digester = resumableDigester.restore(checkpoint)
+    with open(path, "rb") as fd:
+        fd.seek(digester.offset)
+        return digester.readFrom(fd).digest()
+
+
+def throughput(name, seconds, baseline=None, total=size):
+    report("%s, %.2f GB/s" % (name, total / seconds / 1e9), seconds, baseline)
+
+
+def write(path, size):
+    with open(path, "wb") as fd:
+        for _ in range(size // (1024 * 1024)):
+            fd.write(os.urandom(1024 * 1024))
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "blob")
+        write(path, size)
+
+        previous = best(lambda: reader(path), number=1)
+        throughput("fromReader(BytesIO)", previous)
+        throughput("fromStream", best(lambda: stream(path), number=1), previous)
+        throughput(
+            "fromFile", best(lambda: Canonical.fromFile(path), number=1), previous
+        )
+
+        previous = best(lambda: twice(path), number=1)
+        throughput("sha256 and sha512, read twice", previous)
+        throughput(
+            "sha256 and sha512, multiDigester",
+            best(lambda: one_pass(path), number=1),
+            previous,
+        )
+
+        checkpoint = os.path.join(tmp, "blob.checkpoint")
+        digester = resumableDigester()
+        with open(path, "rb") as fd:
+            digester.write(fd.read(size // 10 * 9))
+        digester.checkpoint(checkpoint)
+        previous = best(lambda: stream(path), number=1)
+        report("resume at 90%, from the start", previous)
+        report(
+            "resume at 90%, from a checkpoint",
+            best(lambda: resume(path, checkpoint), number=1),
+            previous,
+        )
+        os.remove(path)
+
+        paths = [os.path.join(tmp, "blob-%s" % i) for i in range(16)]
+        for path in paths:
+            write(path, size // 8)
+        previous = best(lambda: [Canonical.fromFile(p) for p in paths], number=1)
+        throughput("16 files, one at a time", previous, total=size * 2)
+        for workers in sorted({2, 4, os.cpu_count()}):
+            throughput(
+                "16 files, digest_many x%s" % workers,
+                best(lambda: list(digest_many(paths, workers=workers)), number=1),
+                previous,
+                total=size * 2,
+            )
+
+
+if __name__ == "__main__":
+    main()
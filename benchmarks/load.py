@@ -0,0 +1,61 @@
+# Copyright (C) 2019-2022 Vanessa Sochat.
+
+# This Source Code Form is subject to the terms of the
+# Mozilla Public License, v. 2.0. If a copy of the MPL was not distributed
+# with this file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+# Compare a validating load against a trusted (and lazy trusted) load, and
+# making manifest variants by loading against evolve.
+# python -m benchmarks.load
+
+from opencontainers.image.v1 import Descriptor, Index, Manifest
+from benchmarks.utils import best, report
+from benchmarks import data
+
+
+def main():
+    manifest = data.manifest(1, layers=50)
+    index = data.index(manifests=1000)
+
+    for name, cls, content in [
+        ("manifest (50 layers)", Manifest, manifest),
+        ("index (1000 manifests)", Index, index),
+    ]:
+        validated = best(lambda: cls().load(content))
+        report("%s load" % name, validated)
+        report(
+            "%s from_trusted_dict" % name,
+            best(lambda: cls.from_trusted_dict(content)),
+            validated,
+        )
+
+    # Resolve a single entry of a large index, eagerly and lazily
+    eager = best(lambda: Index.from_trusted_dict(index).get("Manifests")[500])
+    report("index (1000 manifests) one entry, eager", eager)
+    report(
+        "index (1000 manifests) one entry, lazy",
+        best(lambda: Index.from_trusted_dict(index, lazy=True).get("Manifests")[500]),
+        eager,
+    )
+
+    # A variant of a manifest (50 layers) with the last layer replaced
+    loaded = Manifest().load(manifest)
+    layer = Descriptor().load(data.descriptor(99))
+    content = dict(manifest, layers=manifest["layers"][:-1] + [data.descriptor(99)])
+    reloaded = best(lambda: Manifest().load(content))
+    report("manifest variant, load", reloaded)
+    report("manifest variant, evolve", best(lambda: variants(loaded, layer)), reloaded)
+
+
+def variants(manifest, layer):
+    """
+    Return a new manifest with the last layer replaced, made with evolve.
+    """
+    layers = manifest.get("Layers")
+    variant = manifest.evolve(Layers=layers[:-1] + [layer])
+    variant.validate()
+    return variant
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+# Copyright (C) 2019-2022 Vanessa Sochat.
+
+# This Source Code Form is subject to the terms of the
+# Mozilla Public License, v. 2.0. If a copy of the MPL was not distributed
+# with this file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+# Measure the memory held per loaded Descriptor (and with an InternPool).
+# python -m benchmarks.memory
+
+from opencontainers.image.v1 import Descriptor
+from opencontainers.digest import Digest
+from opencontainers.struct import InternPool
+from benchmarks import data
+
+import tracemalloc
+import gc
+
+count = 10000
+
+
+def held(generate):
+    """
+    Return the bytes held per structure made by generate.
+
+    The dictionaries are created before measuring, so we only count the
+    structures (and everything they reference that is newly allocated).
+    """
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    structs = generate()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    assert len(structs) == count
+    return (after - before) / count
+
+
+def main():
+    plain = [data.descriptor(i) for i in range(count)]
+    platforms = [
+        data.descriptor(i, platform=data.platforms[i % len(data.platforms)])
+        for i in range(count)
+    ]
+
+    for name, items in [("descriptor", plain), ("descriptor+platform", platforms)]:
+        size = held(lambda: [Descriptor().load(item) for item in items])
+        print("%-24s %8.1f bytes/Descriptor" % (name, size))
+
+    # Layers shared across manifests: 100 different descriptors
+    shared = [data.descriptor(i % 100) for i in range(count)]
+    size = held(lambda: [Descriptor().load(item) for item in shared])
+    print("%-24s %8.1f bytes/Descriptor" % ("shared", size))
+    pool = InternPool(Descriptor, Digest)
+    size = held(lambda: [pool.intern(Descriptor().load(item)) for item in shared])
+    print("%-24s %8.1f bytes/Descriptor" % ("shared+InternPool", size))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+# Copyright (C) 2019-2022 Vanessa Sochat.
+
+# This Source Code Form is subject to the terms of the
+# Mozilla Public License, v. 2.0. If a copy of the MPL was not distributed
+# with this file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+# Compare searching with a pattern string (which goes through the cache in
+# the re module) against a compiled pattern, as used by StructAttr and Digest.
+# python -m benchmarks.regexp
+
+from opencontainers.digest import Parse
+from opencontainers.image.v1 import Descriptor
+from benchmarks.utils import best, report
+from benchmarks import data
+
+import re
+
+count = 10000
+
+
+def main():
+    mediaType = Descriptor.compiled_schema().attrs["MediaType"]
+    values = [data.MediaTypeImageLayerGzip] * count
+
+    # The pattern stays in the re cache
+    warm = best(lambda: [re.search(mediaType.regexp, v) for v in values])
+    report("re.search(string), warm cache x%s" % count, warm)
+    report(
+        "compiled.search x%s" % count,
+        best(lambda: [mediaType.pattern.search(v) for v in values]),
+        warm,
+    )
+
+    # The cache is emptied (e.g., by other libraries) between searches
+    values = values[:1000]
+    cold = best(lambda: [re.purge() or re.search(mediaType.regexp, v) for v in values])
+    report("re.search(string), cold cache x1000", cold)
+    report(
+        "compiled.search, cold cache x1000",
+        best(lambda: [re.purge() or mediaType.pattern.search(v) for v in values]),
+        cold,
+    )
+
+    digests = [data.digest(i) for i in range(count)]
+    report("Parse(digest) x%s" % count, best(lambda: [Parse(d) for d in digests]))
+
+
+if __name__ == "__main__":
+    main()
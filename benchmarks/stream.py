@@ -0,0 +1,58 @@
+# Copyright (C) 2019-2022 Vanessa Sochat.
+
+# This Source Code Form is subject to the terms of the
+# Mozilla Public License, v. 2.0. If a copy of the MPL was not distributed
+# with this file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+# Compare the peak memory (and time) to go through the layers of a very large
+# artifact manifest, loaded at once or streamed with iter_descriptors.
+# python -m benchmarks.stream
+
+from opencontainers.image.v1 import Manifest
+from opencontainers.image.v1.stream import iter_descriptors
+from benchmarks import data
+
+import io
+import json
+import time
+import tracemalloc
+
+layers = 50000
+
+
+def peak(func):
+    """
+    Return the peak memory (in MB) and the time (in seconds) of a call.
+    """
+    tracemalloc.start()
+    start = time.perf_counter()
+    func()
+    seconds = time.perf_counter() - start
+    result = tracemalloc.get_traced_memory()[1] / 1024 / 1024
+    tracemalloc.stop()
+    return result, seconds
+
+
+def loaded(content):
+    manifest = Manifest.from_json(content.getvalue())
+    return sum(layer.get("Size") for layer in manifest.get("Layers"))
+
+
+def streamed(content):
+    content.seek(0)
+    return sum(layer.get("Size") for layer in iter_descriptors(content))
+
+
+def main():
+    content = io.BytesIO(json.dumps(data.manifest(1, layers=layers)).encode("utf-8"))
+    print(
+        "manifest with %s layers: %.1f MB of json"
+        % (layers, len(content.getvalue()) / 1024 / 1024)
+    )
+    for name, func in [("Manifest.from_json", loaded), ("iter_descriptors", streamed)]:
+        memory, seconds = peak(lambda: func(content))
+        print("%-40s %8.1f MB peak %10.3f s" % (name, memory, seconds))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+# Copyright (C) 2019-2022 Vanessa Sochat.
+
+# This Source Code Form is subject to the terms of the
+# Mozilla Public License, v. 2.0. If a copy of the MPL was not distributed
+# with this file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+# Compare summing layer sizes per media type (and distinct layer sizes) over
+# many manifests, as structures or with a DescriptorTable (NumPy is used if
+# it is installed).
+# python -m benchmarks.table
+
+from opencontainers.image.v1 import Manifest
+from opencontainers.image.v1 import table as descriptor_table
+from opencontainers.image.v1.table import DescriptorTable
+from benchmarks.utils import best, report
+from benchmarks import data
+
+count = 2000
+
+
+def structures(manifests):
+    totals, sizes = {}, {}
+    for content in manifests:
+        for layer in Manifest.from_trusted_dict(content).get("Layers"):
+            mediaType = layer.get("MediaType")
+            totals[mediaType] = totals.get(mediaType, 0) + layer.get("Size")
+            sizes[layer.get("Digest")] = layer.get("Size")
+    return totals, sum(sizes.values())
+
+
+def table(manifests):
+    descriptors = DescriptorTable()
+    for content in manifests:
+        descriptors.add(content)
+    return (
+        descriptors.size_by_media_type("layer"),
+        descriptors.unique_size("layer"),
+    )
+
+
+def main():
+    # Manifests that share their first five layers
+    manifests = []
+    for i in range(count):
+        manifest = data.manifest(i, layers=10)
+        manifest["layers"][:5] = data.manifest(0, layers=5)["layers"]
+        manifests.append(manifest)
+    assert structures(manifests) == table(manifests)
+
+    print("numpy: %s" % ("yes" if descriptor_table.numpy else "no"))
+    baseline = best(lambda: structures(manifests), number=1)
+    report("%s manifests, structures" % count, baseline)
+    report(
+        "%s manifests, DescriptorTable" % count,
+        best(lambda: table(manifests), number=1),
+        baseline,
+    )
+
+
+if __name__ == "__main__":
+    main()
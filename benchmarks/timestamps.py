@@ -0,0 +1,45 @@
+# Copyright (C) 2019-2022 Vanessa Sochat.
+
+# This Source Code Form is subject to the terms of the
+# Mozilla Public License, v. 2.0. If a copy of the MPL was not distributed
+# with this file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+# Compare validating timestamps with strptime (the previous validator, which
+# only checked the date) against parse_datetime, with and without its cache.
+# python -m benchmarks.timestamps
+
+from opencontainers.struct import parse_datetime
+from benchmarks.utils import best, report
+
+from datetime import datetime
+
+count = 10000
+
+
+def strptime(value):
+    datetime.strptime(value.split("T")[0], "%Y-%m-%d")
+
+
+def main():
+    # An image history: different timestamps, each seen a few times
+    values = [
+        "2015-10-31T22:%02d:%02d.%09dZ" % (i // 60 % 60, i % 60, i)
+        for i in range(count // 4)
+    ] * 4
+
+    previous = best(lambda: [strptime(v) for v in values])
+    report("strptime (date only) x%s" % count, previous)
+    report(
+        "parse_datetime, no cache x%s" % count,
+        best(lambda: [parse_datetime.__wrapped__(v) for v in values]),
+        previous,
+    )
+    report(
+        "parse_datetime x%s" % count,
+        best(lambda: [parse_datetime(v) for v in values]),
+        previous,
+    )
+
+
+if __name__ == "__main__":
+    main()
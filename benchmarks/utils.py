@@ -0,0 +1,24 @@
+# Copyright (C) 2019-2022 Vanessa Sochat.
+
+# This Source Code Form is subject to the terms of the
+# Mozilla Public License, v. 2.0. If a copy of the MPL was not distributed
+# with this file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+import timeit
+
+
+def best(func, number=10, repeat=5):
+    """
+    Return the best time (in seconds) for a single call of func.
+    """
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number
+
+
+def report(name, seconds, baseline=None):
+    """
+    Print a timing in milliseconds, and the speedup over a baseline.
+    """
+    line = "%-40s %10.3f ms" % (name, seconds * 1000)
+    if baseline:
+        line += "  (%.1fx)" % (baseline / seconds)
+    print(line)
@@ -0,0 +1,135 @@
+# Copyright (C) 2019-2022 Vanessa Sochat.
+
+# This Source Code Form is subject to the terms of the
+# Mozilla Public License, v. 2.0. If a copy of the MPL was not distributed
+# with this file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+# Load (and validate) many structures at once, across a pool of processes.
+# validate_many reports errors for each content instead of exiting.
+#
+# Structures pickle as their class and values (see Struct.__reduce__), so
+# sending content to a worker and a loaded structure back is cheap, and a
+# structure that was validated by a worker isn't validated again here.
+
+from opencontainers.logger import bot
+from concurrent.futures import ProcessPoolExecutor
+from collections import deque
+from functools import partial
+from itertools import islice
+
+
+class Report:
+    """
+    A Report holds the result of validating one content with validate_many.
+
+    index is the position of the content, errors the error messages (empty
+    if valid), valid whether it loaded and struct the loaded structure (None
+    if invalid, or if structures are not kept).
+    """
+
+    def __init__(self, index, errors, struct=None, valid=None):
+        self.index = index
+        self.errors = errors
+        self.struct = struct
+        self.valid = struct is not None if valid is None else valid
+
+    def __str__(self):
+        status = "valid" if self.valid else "invalid"
+        return "<opencontainers.batch.Report-%s:%s>" % (self.index, status)
+
+    def __repr__(self):
+        return self.__str__()
+
+
+def _load(cls, content):
+    """
+    Load one structure from a dictionary, or from json (str or bytes).
+    """
+    if isinstance(content, (str, bytes, bytearray)):
+        return cls.from_json(content)
+    return cls().load(content)
+
+
+def load_many(cls, contents, workers=None, chunksize=16):
+    """
+    Load and validate many structures of a class across a process pool.
+
+    Each content can be a dictionary or json (str or bytes), e.g., raw
+    manifests pulled from a registry. The loaded structures are returned
+    in the same order. As with load, invalid content exits (the SystemExit
+    is raised here, from the worker). The raw json of a structure loaded
+    from bytes is not sent back (see Struct.raw).
+
+    Parameters
+    ==========
+    cls: the structure class to load, e.g., Manifest
+    contents: an iterable of dictionaries or json
+    workers: the number of processes (defaults to the number of CPUs)
+    chunksize: the number of contents sent to a worker at once
+    """
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(partial(_load, cls), contents, chunksize=chunksize))
+
+
+def _validate(cls, keep_structs, indexed):
+    """
+    Load one (index, content) and return a Report, without exiting.
+    """
+    index, content = indexed
+    struct = None
+    with bot.capture() as errors:
+        try:
+            struct = _load(cls, content)
+        except SystemExit:
+            pass
+        except Exception as e:
+            errors.append("%s: %s" % (type(e).__name__, e))
+    if keep_structs:
+        return Report(index, errors, struct)
+    return Report(index, errors, valid=struct is not None)
+
+
+def _validate_chunk(validate, chunk):
+    """
+    Validate a chunk of (index, content) in a worker, and return the Reports.
+    """
+    return [validate(indexed) for indexed in chunk]
+
+
+def validate_many(cls, contents, workers=None, chunksize=16, keep_structs=True):
+    """
+    Validate many contents of a class, and yield a Report for each.
+
+    Unlike load (and load_many), invalid content doesn't exit: the errors
+    that load would log are collected in the Report, so a whole catalog
+    can be audited in one pass. Reports are yielded in order as they are
+    ready. By default contents are validated here, one at a time, and a
+    number of workers validates them across a process pool instead. Only
+    a few chunks per worker are read from contents (and sent to the pool)
+    ahead of the reports, so a large generator isn't read into memory.
+
+    Parameters
+    ==========
+    cls: the structure class to load, e.g., Manifest
+    contents: an iterable of dictionaries or json (str or bytes)
+    workers: the number of processes (None to validate in this process)
+    chunksize: the number of contents sent to a worker at once
+    keep_structs: keep the loaded structures in the reports (set to False
+                  for an audit, so they aren't sent back from the workers)
+    """
+    validate = partial(_validate, cls, keep_structs)
+    if workers is None:
+        for indexed in enumerate(contents):
+            yield validate(indexed)
+        return
+
+    indexed = enumerate(contents)
+    chunks = iter(lambda: list(islice(indexed, chunksize)), [])
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(executor.submit(_validate_chunk, validate, chunk))
+            if len(pending) >= 2 * workers:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
@@ -0,0 +1,398 @@
+# Copyright (C) 2019-2022 Vanessa Sochat.
+
+# This Source Code Form is subject to the terms of the
+# Mozilla Public License, v. 2.0. If a copy of the MPL was not distributed
+# with this file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+# Generate specialized load, validate and to_dict functions for a Struct.
+#
+# The generic Struct methods look at every attribute definition (is it a
+# list, a nested struct, a datetime, is there a regular expression) for
+# every value of every structure. Here the compiled schema of a class is
+# turned into straight line Python source once, so that work is done when
+# the source is generated instead. The generated load only handles valid
+# content: as soon as a check fails it falls back to the generic load, so
+# errors (and exits) are exactly the same.
+#
+# from opencontainers import codegen
+# codegen.install(Descriptor)
+# print(codegen.generate(Descriptor).source)
+
+from opencontainers.struct import Struct, validation_stamps
+from opencontainers.logger import bot
+from datetime import datetime
+
+# Classes with generated functions, and the ones being generated
+codecs = {}
+_generating = set()
+
+# The methods that install replaces
+methods = ["load", "validate", "to_dict"]
+
+# Plain types that can be named directly in the source
+builtins = {str: "str", int: "int", bool: "bool", dict: "dict", list: "list"}
+
+
+class Codec:
+    """
+    A Codec holds the generated source and functions for a Struct class.
+
+    fill(struct, content) loads a dictionary into a structure and returns
+    True, or returns False (leaving it unchanged) if the content is not
+    valid. validate and to_dict are methods for the class, and as_dict
+    returns the dictionary of a structure that is known to be valid.
+    """
+
+    def __init__(self, cls, source, namespace):
+        self.cls = cls
+        self.source = source
+        self.fill = namespace["fill"]
+        self.load = namespace["load"]
+        self.validate = namespace["validate"]
+        self.to_dict = namespace["to_dict"]
+        self.as_dict = namespace["as_dict"]
+
+        # Methods the class defined itself, to restore on uninstall
+        self.originals = {method: cls.__dict__.get(method) for method in methods}
+
+    def __str__(self):
+        return "<opencontainers.codegen.Codec-%s>" % self.cls.__name__
+
+    def __repr__(self):
+        return self.__str__()
+
+
+class Writer:
+    """
+    Write indented lines of source, and the names they refer to.
+    """
+
+    def __init__(self):
+        self.lines = []
+        self.names = {}
+
+    def line(self, text, indent=1):
+        self.lines.append("    " * indent + text)
+
+    def name(self, prefix, value):
+        """
+        Add a value to the namespace, and return the name to refer to it.
+        """
+        name = "_%s%s" % (prefix, len(self.names))
+        self.names[name] = value
+        return name
+
+
+def _type_check(writer, attr, value):
+    """
+    Return an expression that is true if value has the attribute type.
+    """
+    attType = attr.child or attr.attType
+    if attr.is_list:
+        attType = attr.attType[0] if attr.attType else None
+    if attType is datetime:
+        check = "isinstance(%s, str) and %s.validate_datetime(%s)"
+        return check % (value, writer.name("a", attr), value)
+    if attType is None:
+        return "True"
+    return "isinstance(%s, %s)" % (value, _type_name(writer, attType))
+
+
+def _type_name(writer, attType):
+    return builtins.get(attType) or writer.name("t", attType)
+
+
+def _supported(attr):
+    """
+    Determine if an attribute can be generated, and exit if not.
+    """
+    attType = attr.attType
+    if attr.is_list:
+        attType = attType[0] if attType else None
+    if attr.pattern is not None and attType not in [str, datetime]:
+        bot.exit("A regexp for %s (%s) is not supported." % (attr.name, attType))
+    if attr.child is None and attType is not None and not isinstance(attType, type):
+        bot.exit("The type of %s (%s) is not supported." % (attr.name, attType))
+
+
+def _write_make(writer, attr):
+    """
+    Write a function to make a nested structure from a value, or None.
+    """
+    child = attr.child
+    name = "make%s" % attr.index
+    writer.line("def %s(value):" % name, 0)
+
+    # A string or integer structure (e.g., a Digest) loads (and validates)
+    # itself, as a Digest is shared from the parse cache
+    if not attr.mutable:
+        base = "str" if issubclass(child, str) else "int"
+        empty = " or not value" if base == "str" else ""
+        writer.line("if type(value) is not %s%s:" % (base, empty))
+        writer.line("return None", 2)
+        writer.line("try:")
+        writer.line("return %s().load(value)" % writer.name("c", child), 2)
+        writer.line("except Exception:")
+        writer.line("return None", 2)
+
+    # A structure with its own generated functions
+    elif child in codecs:
+        writer.line("if type(value) is not dict:")
+        writer.line("return None", 2)
+        writer.line("struct = _new(%s)" % writer.name("c", child))
+        fill = writer.name("fill", codecs[child].fill)
+        writer.line("return struct if %s(struct, value) else None" % fill)
+
+    # Or one being generated (the class is nested in itself)
+    else:
+        writer.line("return %s().load(value)" % writer.name("c", child))
+    writer.line("", 0)
+    return name
+
+
+def _write_fill(writer, cls, schema):
+    attrs = list(schema.attrs.values())
+    makes = {attr.index: _write_make(writer, attr) for attr in attrs if attr.child}
+
+    writer.line("def fill(self, content):", 0)
+    writer.line("if type(content) is not dict:")
+    writer.line("return False", 2)
+    writer.line("if not %s.issuperset(content):" % writer.name("k", set(schema.json)))
+    writer.line("return False", 2)
+    writer.line("get = content.get")
+    writer.line("values = [None] * %s" % len(attrs))
+
+    for attr in attrs:
+        writer.line("v = get(%r, _missing)" % attr.jsonName)
+        writer.line("if v is not _missing:")
+        pattern = writer.name("p", attr.pattern.search) if attr.pattern else None
+        make = makes.get(attr.index)
+
+        if attr.is_list:
+            writer.line("if not isinstance(v, list):", 2)
+            writer.line("return False", 3)
+            if make:
+                writer.line("v = [%s(item) for item in v]" % make, 2)
+                writer.line("if None in v:", 2)
+                writer.line("return False", 3)
+            else:
+                check = _type_check(writer, attr, "item")
+                if pattern:
+                    check = "%s and %s(item)" % (check, pattern)
+                if check != "True":
+                    writer.line("for item in v:", 2)
+                    writer.line("if not (%s):" % check, 3)
+                    writer.line("return False", 4)
+        elif make:
+            writer.line("v = %s(v)" % make, 2)
+            writer.line("if v is None:", 2)
+            writer.line("return False", 3)
+        else:
+            check = _type_check(writer, attr, "v")
+            if pattern:
+                check = "%s and %s(v)" % (check, pattern)
+            writer.line("if not (%s):" % check, 2)
+            writer.line("return False", 3)
+        writer.line("values[%s] = v" % attr.index, 2)
+
+    required = [attr.index for attr in attrs if attr.required]
+    if required:
+        checks = " or ".join("not values[%s]" % index for index in required)
+        writer.line("if %s:" % checks)
+        writer.line("return False", 2)
+
+    writer.line("self._values = values")
+    if hasattr(cls, "_validate"):
+        writer.line("if not self._validate():")
+        writer.line('bot.exit("%s is invalid" % self)', 2)
+    writer.line("self._validated = next(_stamps)")
+    writer.line("return True")
+    writer.line("", 0)
+
+
+def _write_validate(writer, cls, schema):
+    writer.line("def validate(self):", 0)
+    writer.line("if type(self) is not _cls or '_schema' in self.__dict__:")
+    writer.line("return _generic_validate(self)", 2)
+    writer.line("if self._is_validated():")
+    writer.line("return True", 2)
+    writer.line("values = self._values")
+
+    for attr in schema.attrs.values():
+        writer.line("v = values[%s]" % attr.index)
+        indent = 1
+        if attr.required:
+            writer.line("if not v:")
+            writer.line("bot.error(%r)" % ("%s is required." % attr.name), 2)
+            writer.line("return False", 2)
+        else:
+            writer.line("if v:")
+            indent = 2
+
+        message = "bot.error(%r)" % ("%s should be type %s" % (attr.name, attr.attType))
+        if attr.is_list:
+            writer.line("if not isinstance(v, list):", indent)
+            writer.line(message, indent + 1)
+            writer.line("return False", indent + 1)
+            check = _type_check(writer, attr, "item")
+            if check != "True":
+                writer.line("for item in v:", indent)
+                writer.line("if not (%s):" % check, indent + 1)
+                writer.line(message, indent + 2)
+                writer.line("return False", indent + 2)
+        else:
+            writer.line("if not (%s):" % _type_check(writer, attr, "v"), indent)
+            writer.line(message, indent + 1)
+            writer.line("return False", indent + 1)
+
+        # Nested structures are only validated if changed
+        if attr.mutable:
+            invalid = "bot.error(%r)" % ("%s is invalid" % attr.name)
+            if attr.is_list:
+                writer.line("for item in v:", indent)
+                writer.line("if not item.validate():", indent + 1)
+                writer.line(invalid, indent + 2)
+                writer.line("return False", indent + 2)
+            else:
+                writer.line("if not v.validate():", indent)
+                writer.line(invalid, indent + 1)
+                writer.line("return False", indent + 1)
+
+    if hasattr(cls, "_validate"):
+        writer.line("if not self._validate():")
+        writer.line("return False", 2)
+    writer.line("self._validated = next(_stamps)")
+    writer.line("return True")
+    writer.line("", 0)
+
+
+def _write_to_dict(writer, cls, schema):
+    writer.line("def as_dict(self):", 0)
+    writer.line("if type(self) is not _cls or '_schema' in self.__dict__:")
+    writer.line("return self.to_dict()", 2)
+    writer.line("values = self._values")
+    writer.line("result = {}")
+
+    for attr in schema.attrs.values():
+        if attr.hide:
+            continue
+        if attr.mutable and attr.child in codecs:
+            as_dict = writer.name("dict", codecs[attr.child].as_dict)
+            value = "%s(v)" % as_dict
+            if attr.is_list:
+                value = "[%s(item) for item in v]" % as_dict
+        elif attr.mutable:
+            value = "%s.to_dict(v)" % writer.name("a", attr)
+        elif attr.is_list:
+            value = "list(v)"
+        elif attr.attType is list:
+            value = "%s.to_dict(v)" % writer.name("a", attr)
+        else:
+            value = "v"
+        writer.line("v = values[%s]" % attr.index)
+        writer.line("if v:")
+        writer.line("result[%r] = %s" % (attr.jsonName, value), 2)
+        if not attr.omitempty:
+            writer.line("else:")
+            writer.line("result[%r] = %r" % (attr.jsonName, attr.empty()), 2)
+
+    writer.line("return result")
+    writer.line("", 0)
+
+    writer.line("def to_dict(self):", 0)
+    writer.line("if type(self) is not _cls or '_schema' in self.__dict__:")
+    writer.line("return _generic_to_dict(self)", 2)
+    writer.line("if self.validate():")
+    writer.line("return as_dict(self)", 2)
+    writer.line("", 0)
+
+
+def _write_load(writer):
+    writer.line("def load(self, content, validate=True):", 0)
+    writer.line(
+        "if (not validate or type(self) is not _cls or '_schema' in self.__dict__"
+    )
+    writer.line("or self._hash is not None or not fill(self, content)):", 2)
+    writer.line("return _generic_load(self, content, validate)", 2)
+    writer.line("if self._raw is not None:")
+    writer.line("self._raw = None", 2)
+    writer.line("return self")
+
+
+def generate(cls):
+    """
+    Generate (once) the functions for a Struct class, and return its Codec.
+
+    Nested structures get their own Codec first. Attributes that can't be
+    generated (e.g., a regexp for a type that isn't a string) exit.
+    """
+    codec = codecs.get(cls)
+    if codec is not None:
+        return codec
+
+    schema = cls.compiled_schema()
+    _generating.add(cls)
+    try:
+        for attr in schema.attrs.values():
+            _supported(attr)
+            if attr.mutable and attr.child not in _generating:
+                generate(attr.child)
+    finally:
+        _generating.discard(cls)
+
+    writer = Writer()
+    _write_fill(writer, cls, schema)
+    _write_validate(writer, cls, schema)
+    _write_to_dict(writer, cls, schema)
+    _write_load(writer)
+    source = "\n".join(writer.lines) + "\n"
+
+    namespace = {
+        "bot": bot,
+        "_cls": cls,
+        "_new": object.__new__,
+        "_missing": object(),
+        "_stamps": validation_stamps,
+        "_generic_load": getattr(cls, "load"),
+        "_generic_validate": getattr(cls, "validate"),
+        "_generic_to_dict": getattr(cls, "to_dict"),
+    }
+    namespace.update(writer.names)
+    filename = "<opencontainers.codegen %s.%s>" % (cls.__module__, cls.__name__)
+    exec(compile(source, filename, "exec"), namespace)
+
+    codec = codecs[cls] = Codec(cls, source, namespace)
+    return codec
+
+
+def install(*classes):
+    """
+    Generate functions for Struct classes, and use them as their methods.
+
+    The methods are only used for instances of exactly the class, with the
+    attributes of the class, so subclasses keep the generic methods.
+    """
+    for cls in classes:
+        if not issubclass(cls, Struct) or issubclass(cls, (str, int)):
+            bot.exit("%s is not a Struct with attributes." % cls)
+        codec = generate(cls)
+        for method in methods:
+            setattr(cls, method, getattr(codec, method))
+
+
+def uninstall(*classes):
+    """
+    Go back to the generic methods for Struct classes.
+    """
+    for cls in classes:
+        codec = codecs.get(cls)
+        if codec is None:
+            continue
+        for method in methods:
+            if cls.__dict__.get(method) is not getattr(codec, method):
+                continue
+            original = codec.originals[method]
+            if original is None:
+                delattr(cls, method)
+            else:
+                setattr(cls, method, original)
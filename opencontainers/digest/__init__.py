@@ -13,8 +13,22 @@ from .digest import (
     FromString,
     FromBytes,
     Parse,
+    ParseDigest,
+    ParsedDigest,
 )
 
-from .algorithm import Algorithm, SHA256, SHA384, SHA512, Canonical
+from .algorithm import (
+    Algorithm,
+    RegisterAlgorithm,
+    SHA256,
+    SHA384,
+    SHA512,
+    Canonical,
+)
 
+from .digester import multiDigester
 from .verifiers import hashVerifier
+
+from .batch import digest_many
+from .resumable import resumableDigester
+from .digestset import DigestSet
@@ -6,14 +6,17 @@
 
 from opencontainers.struct import StrStruct
 from opencontainers.logger import bot
-from .digester import digester
+from .digester import digester, readChunks
 from .exceptions import (
     ErrDigestInvalidFormat,
     ErrDigestUnsupported,
     ErrDigestInvalidLength,
 )
 
+from collections import namedtuple
+import functools
 import hashlib
+import mmap
 import re
 import io
 
@@ -30,23 +33,30 @@ class Algorithm(StrStruct):
         self._algorithm = value
         super().__init__(value)
 
-    def available(self):
+    def info(self):
         """
-        Available returns true if the digest type is available for use.
+        Return the registered AlgorithmInfo, or None if not available.
 
-        If this returns false, Digester and Hash will return None.
         we are flexible to allow the user to also provide a full digest
         """
         algorithm = self.value
 
         # If we have a full digest, name is separated by :
-        match = re.search("^(?P<algorithm>.+?):(?P<digest>.+)", self.value)
-        if match:
-            algorithm = match.group("algorithm")
+        if algorithm and ":" in algorithm:
+            match = fullDigestRegexp.search(algorithm)
+            if match:
+                algorithm = match.group("algorithm")
 
         self._algorithm = algorithm
+        return registry.get(algorithm)
+
+    def available(self):
+        """
+        Available returns true if the digest type is available for use.
 
-        return algorithm in algorithms
+        If this returns false, Digester and Hash will return None.
+        """
+        return self.info() is not None
 
     def digester(self):
         """
@@ -64,9 +74,10 @@ class Algorithm(StrStruct):
         """
         Hash returns a new hash as used by the algorithm.
         """
-        if not self.available():
+        info = self.info()
+        if info is None:
             return None
-        return hashlib.new(self._algorithm)
+        return info.new()
 
     def validate(self, encoded):
         """
@@ -75,17 +86,16 @@ class Algorithm(StrStruct):
         This means ensuring that the algorithm is available, checking it's length,
         and the characters provided.
         """
-        if not self.available():
+        info = self.info()
+        if info is None:
             raise ErrDigestUnsupported()
 
         # Digests much always be hex-encoded, ensuring that their hex portion will
         # always be size*2
-        hashy = hashlib.new(self._algorithm)
-        if hashy.digest_size * 2 != len(encoded):
+        if info.encodedSize != len(encoded):
             raise ErrDigestInvalidLength()
 
-        regexp = anchoredEncodedRegexps.get(self._algorithm)
-        if not regexp.search(encoded):
+        if not info.regexp.search(encoded):
             raise ErrDigestInvalidFormat()
         return True
 
@@ -93,12 +103,10 @@ class Algorithm(StrStruct):
         """
         Size returns number of bytes returned by the hash.
         """
-        if not self.available():
+        info = self.info()
+        if info is None:
             return 0
-        hashy = hashlib.new(self._algorithm)
-
-        # Need to ensure that the digest size == bytes and we don't want block_size
-        return hashy.digest_size
+        return info.size
 
     def set(self, value):
         """
@@ -136,6 +144,43 @@ class Algorithm(StrStruct):
             bot.exit("input must be io.BytesIO")
         return self.fromBytes(ioReader.read())
 
+    def fromStream(self, stream, chunk_size=1 << 20):
+        """
+        FromStream digests a file-like object (opened in binary mode).
+
+        The stream is read in chunks of chunk_size bytes, into one buffer
+        that is reused (with readinto, if the stream has it), so memory
+        doesn't grow with the size of the content.
+        """
+        digester = self.digester()
+        if digester.hash is None:
+            bot.exit("Algorithm %s is not available" % self)
+
+        for chunk in readChunks(stream, chunk_size):
+            digester.hash.update(chunk)
+        return digester.digest()
+
+    def fromFile(self, path, chunk_size=1 << 20):
+        """
+        FromFile digests a file (e.g., a layer tarball) by its path.
+
+        The file is memory mapped and hashed without a copy. hashlib releases
+        the GIL while it hashes, so files can be digested in threads. Files
+        that can't be mapped (or are empty) are read with fromStream.
+        """
+        digester = self.digester()
+        if digester.hash is None:
+            bot.exit("Algorithm %s is not available" % self)
+
+        with open(path, "rb") as fd:
+            try:
+                mapped = mmap.mmap(fd.fileno(), 0, access=mmap.ACCESS_READ)
+            except (ValueError, OSError):
+                return self.fromStream(fd, chunk_size)
+            with mapped:
+                digester.hash.update(mapped)
+        return digester.digest()
+
     def fromBytes(self, content):
         """FromBytes digests the input and returns a Digest."""
         digester = self.digester()
@@ -154,6 +199,57 @@ class Algorithm(StrStruct):
         return self.fromBytes(content)
 
 
+class AlgorithmInfo(
+    namedtuple("AlgorithmInfo", "algorithm new size encodedSize regexp")
+):
+    """
+    AlgorithmInfo holds what is known about a registered algorithm.
+
+    algorithm: the Algorithm
+    new: a function that returns a new hash object
+    size: the number of bytes returned by the hash
+    encodedSize: the length of the (hex) encoded portion of a digest
+    regexp: the anchored regular expression for the encoded portion
+    """
+
+    __slots__ = ()
+
+
+def RegisterAlgorithm(algorithm, new=None):
+    """
+    RegisterAlgorithm makes an algorithm available, and returns True.
+
+    new is a function that returns a new hash object (by default, from
+    hashlib). The hash is only created once, here, to learn the size, and
+    the encoded portion is lowercase hex of that size, as for all digests.
+    The algorithms and anchoredEncodedRegexps lookups are updated too. If
+    the algorithm is already registered, it isn't changed and False is
+    returned. A name can only have lowercase letters and digits, as
+    separators (+._-) start the extra component of a digest.
+    """
+    if not algorithmNameRegexp.search(algorithm):
+        bot.exit("%s is not a valid algorithm name." % algorithm)
+
+    algorithm = algorithms.get(algorithm) or Algorithm(algorithm)
+    if algorithm in registry:
+        return False
+
+    if new is None and algorithm in hashlib.algorithms_guaranteed:
+        new = getattr(hashlib, algorithm)
+    elif new is None:
+        new = functools.partial(hashlib.new, algorithm)
+    try:
+        size = new().digest_size
+    except ValueError:
+        bot.exit("%s is not available in hashlib." % algorithm)
+    regexp = re.compile("^[a-f0-9]{%s}$" % (size * 2))
+
+    registry[algorithm] = AlgorithmInfo(algorithm, new, size, size * 2, regexp)
+    algorithms[algorithm] = algorithm
+    anchoredEncodedRegexps[algorithm] = regexp
+    return True
+
+
 # supported digest types only to match GoLang
 
 SHA256 = Algorithm("sha256")  # sha256 with hex encoding (lower case only)
@@ -168,13 +264,25 @@ Canonical = SHA256
 # may be available but they cannot be calculated by the digest package.
 # this mirrors GoLang (there are more available in Python)
 
-algorithms = {"sha256": SHA256, "sha384": SHA384, "sha512": SHA512}
+algorithms = {}
+
+# registry maps algorithm names to their AlgorithmInfo (see RegisterAlgorithm)
+
+registry = {}
+
+# fullDigestRegexp matches a full digest, to separate the algorithm name
+
+fullDigestRegexp = re.compile("^(?P<algorithm>.+?):(?P<digest>.+)")
+
+# algorithmNameRegexp matches the name of an algorithm that can be registered
+
+algorithmNameRegexp = re.compile("^[a-z0-9]+$")
 
 # anchoredEncodedRegexps contains anchored regular expressions for hex-encoded
 # digests. Note that /A-F/ disallowed.
 
-anchoredEncodedRegexps = {
-    SHA256: re.compile("^[a-f0-9]{64}$"),
-    SHA384: re.compile("^[a-f0-9]{96}$"),
-    SHA512: re.compile("^[a-f0-9]{128}$"),
-}
+anchoredEncodedRegexps = {}
+
+RegisterAlgorithm(SHA256, hashlib.sha256)
+RegisterAlgorithm(SHA384, hashlib.sha384)
+RegisterAlgorithm(SHA512, hashlib.sha512)
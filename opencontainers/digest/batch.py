@@ -0,0 +1,53 @@
+# Copyright (C) 2019-2022 Vanessa Sochat.
+
+# This Source Code Form is subject to the terms of the
+# Mozilla Public License, v. 2.0. If a copy of the MPL was not distributed
+# with this file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+# Digest many files at once, across a pool of threads. hashlib releases the
+# GIL while it hashes, so threads hash files (see Algorithm.fromFile) on as
+# many cores as there are workers, without sending content between processes.
+
+from opencontainers.logger import bot
+from .algorithm import Algorithm, Canonical
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import os
+
+
+def _digest(algorithm, path):
+    """
+    Digest one file, and return the path, digest and size.
+    """
+    size = os.path.getsize(path)
+    return path, algorithm.fromFile(path), size
+
+
+def digest_many(paths, algorithm=Canonical, workers=None):
+    """
+    Digest many files in a thread pool, and yield (path, digest, size).
+
+    Results are yielded as files are done (not in order), e.g., to write
+    the blobs of an image layout or verify a pulled image. An error for a
+    file (e.g., it doesn't exist) is raised when its result is reached.
+
+    Parameters
+    ==========
+    paths: an iterable of file paths
+    algorithm: the Algorithm (or its name) to digest with
+    workers: the number of threads (defaults to the ThreadPoolExecutor default)
+    """
+    if not isinstance(algorithm, Algorithm):
+        algorithm = Algorithm(algorithm)
+    if not algorithm.available():
+        bot.exit("Algorithm %s is not available" % algorithm)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(_digest, algorithm, path) for path in paths]
+        try:
+            for future in as_completed(futures):
+                yield future.result()
+        finally:
+            # If iteration stops early, don't digest the rest
+            for future in futures:
+                future.cancel()
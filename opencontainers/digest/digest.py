@@ -6,10 +6,23 @@
 
 from opencontainers.struct import StrStruct
 from opencontainers.logger import bot
-from .algorithm import Algorithm
-from .exceptions import ErrDigestInvalidFormat
+from .algorithm import Algorithm, algorithms
+from .exceptions import (
+    ErrDigestInvalidFormat,
+    ErrDigestInvalidLength,
+    ErrDigestUnsupported,
+)
+from collections import namedtuple
+import functools
 import re
 
+# The errors raised when parsing a digest that isn't valid
+ErrDigestInvalid = (
+    ErrDigestInvalidFormat,
+    ErrDigestInvalidLength,
+    ErrDigestUnsupported,
+)
+
 
 class Digest(StrStruct):
     """
@@ -34,22 +47,27 @@ class Digest(StrStruct):
         if not self:
             bot.exit("Empty digest")
 
-        regexp = "^[a-z0-9]+(?:[+._-][a-z0-9]+)*:[a-zA-Z0-9=_-]+$"
+        # Parsed once, and then found in the cache
+        ParseDigest(str(self))
+        return True
 
-        # Must match for a digest
-        if not re.search(regexp, self):
-            raise ErrDigestInvalidFormat()
+    def load(self, content, validate=True):
+        """
+        Load a digest string, returning the digest that Parse caches for it.
 
-        algorithm, encoded = (self).split(":")
+        Structures (e.g., a Descriptor) loading the same digest share one
+        Digest, instead of each holding its own copy.
+        """
+        if isinstance(content, str):
+            return Parse(content)
 
-        # Remove the extra component, if there
-        match = re.search("[+._-]", algorithm)
-        if match:
-            algorithm = algorithm[: match.start()]
-        algorithm = Algorithm(algorithm)
+    def parsed(self):
+        """
+        Return the parsed digest (algorithm, encoded and raw bytes).
 
-        # Also checks if algorithm.available()
-        return algorithm.validate(encoded)
+        This raises the same errors as validate if the digest is invalid.
+        """
+        return ParseDigest(str(self))
 
     def sepIndex(self):
         """
@@ -67,7 +85,7 @@ class Digest(StrStruct):
         if not algorithm or not encoded:
             bot.exit("empty digest or algorithm")
 
-        match = re.search("[+._-]", algorithm)
+        match = separatorRegexp.search(algorithm)
         if match:
             return match.start()
         return self.index(":", 1)
@@ -79,21 +97,26 @@ class Digest(StrStruct):
         in the case of having an extra component, return the start of the
         encoded portion
         """
-        match = re.search(":", self, 1)
-        return match.start() + 1
+        return self.index(":") + 1
 
     @property
     def algorithm(self):
         """
         Algorithm returns the algorithm portion of the digest.
         """
-        return Algorithm(self[: self.sepIndex()])
+        try:
+            return ParseDigest(str(self)).algorithm
+        except ErrDigestInvalid:
+            return Algorithm(self[: self.sepIndex()])
 
     def encoded(self):
         """
         Encoded returns the encoded portion of the digest.
         """
-        return self[self.startEncodedIndex() :]
+        try:
+            return ParseDigest(str(self)).encoded
+        except ErrDigestInvalid:
+            return self[self.startEncodedIndex() :]
 
     def verifier(self):
         """
@@ -114,7 +137,60 @@ class Digest(StrStruct):
 DigestRegexp = re.compile("[a-z0-9]+(?:[.+_-][a-z0-9]+)*:[a-zA-Z0-9=_-]+")
 
 # DigestRegexpAnchored matches valid digest types, anchored to the start and end of the match.
-DigestRegexpAnchored = re.compile("^%s$" % DigestRegexp)
+DigestRegexpAnchored = re.compile("^%s$" % DigestRegexp.pattern)
+
+# separatorRegexp matches the separator of an extra algorithm component
+separatorRegexp = re.compile("[+._-]")
+
+
+class ParsedDigest(namedtuple("ParsedDigest", "digest algorithm")):
+    """
+    A ParsedDigest holds the parts of a valid digest, and can't be changed.
+
+    digest: the Digest
+    algorithm: the Algorithm (without an extra component, e.g., +b64)
+    encoded: the encoded portion of the digest
+    raw: the bytes that the encoded portion decodes to
+
+    Only the digest and the (shared) algorithm are kept, so a cached digest
+    doesn't hold copies of its encoded portion.
+    """
+
+    __slots__ = ()
+
+    @property
+    def encoded(self):
+        return self.digest[self.digest.index(":") + 1 :]
+
+    @property
+    def raw(self):
+        return bytes.fromhex(self.encoded)
+
+
+@functools.lru_cache(maxsize=8192)
+def ParseDigest(string):
+    """
+    ParseDigest validates a digest string and returns a ParsedDigest.
+
+    Services see the same digests over and over, so the result for the most
+    recent 8192 strings is cached, and the same (interned) Digest is returned
+    for a string. Invalid digests raise (and are not cached).
+    """
+    # Must match for a digest
+    if not DigestRegexpAnchored.search(string):
+        raise ErrDigestInvalidFormat()
+
+    name, encoded = string.split(":")
+
+    # Remove the extra component, if there
+    match = separatorRegexp.search(name)
+    if match:
+        name = name[: match.start()]
+    algorithm = algorithms.get(name) or Algorithm(name)
+
+    # Also checks if algorithm.available()
+    algorithm.validate(encoded)
+    return ParsedDigest(Digest(string), algorithm)
 
 
 def NewDigestFromEncoded(algorithm, encoded):
@@ -162,8 +238,9 @@ def Parse(string):
     """
     Parse parses s and returns the validated digest object.
 
-    An error will be returned if the format is invalid.
+    An error will be returned if the format is invalid. Parsing a string
+    again returns the same digest, from the cache (see ParseDigest).
     """
-    d = Digest(string)
-    d.validate()
-    return d
+    if not string:
+        bot.exit("Empty digest")
+    return ParseDigest(str(string)).digest
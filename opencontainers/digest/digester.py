@@ -5,7 +5,7 @@
 # with this file, You can obtain one at http://mozilla.org/MPL/2.0/.
 
 from opencontainers.struct import Struct
-from hashlib import new
+from opencontainers.logger import bot
 
 
 class Digester(Struct):
@@ -36,3 +36,73 @@ class digester(Struct):
         from .digest import NewDigest
 
         return NewDigest(self.alg, self.hash)
+
+
+class multiDigester(Struct):
+    """
+    A multiDigester calculates the digests of data under several algorithms.
+
+    Each write updates the hash of every algorithm, so a blob only needs to
+    be read once (e.g., with readFrom) to get, for example, both its sha256
+    and sha512 digests.
+    """
+
+    def __init__(self, algorithms=None):
+        from .algorithm import Algorithm, SHA256, SHA512
+
+        super().__init__()
+        self.hashes = {}
+        for alg in algorithms or (SHA256, SHA512):
+            if not isinstance(alg, Algorithm):
+                alg = Algorithm(alg)
+            hashObj = alg.hash()
+            if hashObj is None:
+                bot.exit("Algorithm %s is not available" % alg)
+            self.hashes[alg] = hashObj
+
+    def write(self, content):
+        """
+        Add bytes of content (or any bytes-like object) to every hash.
+        """
+        for hashObj in self.hashes.values():
+            hashObj.update(content)
+
+    def readFrom(self, stream, chunk_size=1 << 20):
+        """
+        Write everything from a file-like object (opened in binary mode).
+
+        The stream is read once, in chunks, and each chunk goes to every hash.
+        """
+        for chunk in readChunks(stream, chunk_size):
+            self.write(chunk)
+        return self
+
+    def digests(self):
+        """
+        Return the current digest for each algorithm.
+        """
+        from .digest import NewDigest
+
+        return {alg: NewDigest(alg, hashObj) for alg, hashObj in self.hashes.items()}
+
+
+def readChunks(stream, chunk_size=1 << 20):
+    """
+    Yield the content of a file-like object in chunks of chunk_size bytes.
+
+    If the stream has readinto, the chunks are views of one buffer that is
+    reused (so each must be used before the next), otherwise they are the
+    bytes that read returns.
+    """
+    readinto = getattr(stream, "readinto", None)
+    if readinto is None:
+        yield from iter(lambda: stream.read(chunk_size), b"")
+        return
+
+    buffer = bytearray(chunk_size)
+    with memoryview(buffer) as view:
+        while True:
+            size = readinto(buffer)
+            if not size:
+                return
+            yield view[:size]
@@ -0,0 +1,199 @@
+# Copyright (C) 2019-2022 Vanessa Sochat.
+
+# This Source Code Form is subject to the terms of the
+# Mozilla Public License, v. 2.0. If a copy of the MPL was not distributed
+# with this file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+# A set of digests that can be looked up by a short (prefix) form, like the
+# digestset of go-digest.
+#
+# Digests are kept as strings ("<encoded>:<algorithm>") in sorted lists, one
+# list (bucket) per first few characters of the encoded portion. Encoded
+# portions are hashes, so buckets stay small and even, and finding (or adding
+# or removing) a digest is a binary search in one small list, even for
+# millions of digests.
+
+from .digest import Digest, ErrDigestInvalid, ParseDigest
+from .exceptions import ErrDigestNotFound, ErrDigestAmbiguous
+
+import bisect
+
+# The number of characters of the encoded portion that choose a bucket
+bucketPrefix = 3
+
+
+class DigestSet:
+    """
+    A DigestSet holds digests, and finds them by a unique encoded prefix.
+
+    lookup takes a full digest (algorithm:encoded), or the start of the
+    encoded portion (e.g., the first 12 characters) of one digest in the set,
+    with or without the algorithm.
+    """
+
+    def __init__(self, digests=None):
+        self.buckets = {}
+        self.count = 0
+        for digest in digests or []:
+            self.add(digest)
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        return iter(self.all())
+
+    def __contains__(self, digest):
+        try:
+            return self._find(self._key(digest))[1]
+        except ErrDigestInvalid:
+            return False
+
+    def __str__(self):
+        return "<opencontainers.digest.digestset.DigestSet-%s>" % len(self)
+
+    def __repr__(self):
+        return self.__str__()
+
+    def _key(self, digest):
+        """
+        Validate a digest, and return its key ("<encoded>:<algorithm>").
+        """
+        algorithm, encoded = ParseDigest(str(digest)).digest.split(":")
+        return "%s:%s" % (encoded, algorithm)
+
+    def _find(self, key):
+        """
+        Return the bucket, and whether the key is in it, and its position.
+        """
+        bucket = self.buckets.get(key[:bucketPrefix])
+        if bucket is None:
+            return None, False, 0
+        index = bisect.bisect_left(bucket, key)
+        return bucket, index < len(bucket) and bucket[index] == key, index
+
+    def _digest(self, key):
+        encoded, _, algorithm = key.rpartition(":")
+        return Digest("%s:%s" % (algorithm, encoded))
+
+    def add(self, digest):
+        """
+        Add a (valid) digest, and return True if it wasn't in the set.
+        """
+        key = self._key(digest)
+        bucket, found, index = self._find(key)
+        if found:
+            return False
+        if bucket is None:
+            bucket = self.buckets[key[:bucketPrefix]] = []
+        bucket.insert(index, key)
+        self.count += 1
+        return True
+
+    def remove(self, digest):
+        """
+        Remove a digest, raising ErrDigestNotFound if it isn't in the set.
+        """
+        key = self._key(digest)
+        bucket, found, index = self._find(key)
+        if not found:
+            raise ErrDigestNotFound()
+        del bucket[index]
+        if not bucket:
+            del self.buckets[key[:bucketPrefix]]
+        self.count -= 1
+
+    def _prefixed(self, prefix):
+        """
+        Yield the keys whose encoded portion starts with prefix, in order.
+        """
+        # A prefix longer than the buckets' is only looked for in one
+        if len(prefix) >= bucketPrefix:
+            bucket = self.buckets.get(prefix[:bucketPrefix], [])
+            for index in range(bisect.bisect_left(bucket, prefix), len(bucket)):
+                if not bucket[index].startswith(prefix):
+                    break
+                yield bucket[index]
+        else:
+            for name in sorted(self.buckets):
+                if name.startswith(prefix):
+                    yield from self.buckets[name]
+
+    def lookup(self, string):
+        """
+        Return the digest for a full digest or a short (encoded prefix) form.
+
+        A short form can keep the algorithm (e.g., sha256:9834876dcfb0), and
+        then only digests of that algorithm match. ErrDigestNotFound is
+        raised if no digest matches, and ErrDigestAmbiguous if more than one
+        digest starts with the prefix.
+        """
+        algorithm = None
+        if ":" in string:
+            try:
+                key = self._key(string)
+            except ErrDigestInvalid:
+                algorithm, _, string = string.partition(":")
+            else:
+                if not self._find(key)[1]:
+                    raise ErrDigestNotFound()
+                return self._digest(key)
+
+        if not string or ":" in string:
+            raise ErrDigestNotFound()
+
+        matches = []
+        for key in self._prefixed(string):
+            if algorithm is None or key.rpartition(":")[2] == algorithm:
+                matches.append(key)
+                if len(matches) > 1:
+                    break
+
+        if not matches:
+            raise ErrDigestNotFound()
+        if len(matches) > 1:
+            raise ErrDigestAmbiguous()
+        return self._digest(matches[0])
+
+    def all(self):
+        """
+        Return all digests, sorted by encoded portion.
+        """
+        return [
+            self._digest(key)
+            for name in sorted(self.buckets)
+            for key in self.buckets[name]
+        ]
+
+    def shortCodeTable(self, length=12):
+        """
+        Return the shortest unique prefix (of at least length) of each digest.
+
+        The result maps each digest to its short form, which lookup finds. A
+        digest whose whole encoded portion is shared (by another algorithm)
+        keeps its full form.
+        """
+        keys = [key for name in sorted(self.buckets) for key in self.buckets[name]]
+        encoded = [key.rpartition(":")[0] for key in keys]
+
+        def common(first, second):
+            size = 0
+            for a, b in zip(first, second):
+                if a != b:
+                    break
+                size += 1
+            return size
+
+        table = {}
+        for index, key in enumerate(keys):
+            shared = 0
+            if index:
+                shared = common(encoded[index - 1], encoded[index])
+            if index + 1 < len(keys):
+                shared = max(shared, common(encoded[index], encoded[index + 1]))
+            digest = self._digest(key)
+            if shared >= len(encoded[index]):
+                table[digest] = str(digest)
+            else:
+                table[digest] = encoded[index][: max(length, shared + 1)]
+        return table
@@ -30,3 +30,21 @@ class ErrDigestUnsupported(Exception):
 
     def __init__(self):
         super().__init__("unsupported digest algorithm")
+
+
+class ErrDigestNotFound(Exception):
+    """
+    Returned when a digest (or prefix) is not in a DigestSet.
+    """
+
+    def __init__(self):
+        super().__init__("digest not found")
+
+
+class ErrDigestAmbiguous(Exception):
+    """
+    Returned when a short digest (prefix) matches more than one digest.
+    """
+
+    def __init__(self):
+        super().__init__("ambiguous digest string")
@@ -0,0 +1,359 @@
+# Copyright (C) 2019-2022 Vanessa Sochat.
+
+# This Source Code Form is subject to the terms of the
+# Mozilla Public License, v. 2.0. If a copy of the MPL was not distributed
+# with this file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+# Digest a blob across interrupted transfers.
+#
+# A hashlib object can't be saved, so a transfer that dies at 90% has to hash
+# the blob again from the start. Here sha256 is computed by an implementation
+# whose state (the hash words, the bytes hashed so far and the ones not yet in
+# a block) can be exported: OpenSSL's libcrypto through ctypes if it can be
+# loaded, and pure Python (much slower) otherwise. Both use the same state, so
+# a checkpoint saved with one can be restored with the other.
+#
+# libcrypto is only loaded when a resumable hash is first created, not when
+# the package is imported. It is used through the (deprecated, but still
+# exported) SHA256_Init/Update/Final functions and the SHA256_CTX layout, so
+# it is checked against hashlib once loaded, and not used if they differ.
+
+from opencontainers.struct import Struct
+from opencontainers.logger import bot
+from .algorithm import SHA256
+from .digester import readChunks
+
+import ctypes
+import ctypes.util
+import hashlib
+import json
+import os
+import struct
+import sys
+
+# The initial hash words, and round constants, of sha256
+# fmt: off
+initial = (
+    0x6A09E667, 0xBB67AE85, 0x3C6EF372, 0xA54FF53A, 0x510E527F, 0x9B05688C,
+    0x1F83D9AB, 0x5BE0CD19,
+)
+
+constants = (
+    0x428A2F98, 0x71374491, 0xB5C0FBCF, 0xE9B5DBA5, 0x3956C25B, 0x59F111F1,
+    0x923F82A4, 0xAB1C5ED5, 0xD807AA98, 0x12835B01, 0x243185BE, 0x550C7DC3,
+    0x72BE5D74, 0x80DEB1FE, 0x9BDC06A7, 0xC19BF174, 0xE49B69C1, 0xEFBE4786,
+    0x0FC19DC6, 0x240CA1CC, 0x2DE92C6F, 0x4A7484AA, 0x5CB0A9DC, 0x76F988DA,
+    0x983E5152, 0xA831C66D, 0xB00327C8, 0xBF597FC7, 0xC6E00BF3, 0xD5A79147,
+    0x06CA6351, 0x14292967, 0x27B70A85, 0x2E1B2138, 0x4D2C6DFC, 0x53380D13,
+    0x650A7354, 0x766A0ABB, 0x81C2C92E, 0x92722C85, 0xA2BFE8A1, 0xA81A664B,
+    0xC24B8B70, 0xC76C51A3, 0xD192E819, 0xD6990624, 0xF40E3585, 0x106AA070,
+    0x19A4C116, 0x1E376C08, 0x2748774C, 0x34B0BCB5, 0x391C0CB3, 0x4ED8AA4A,
+    0x5B9CCA4F, 0x682E6FF3, 0x748F82EE, 0x78A5636F, 0x84C87814, 0x8CC70208,
+    0x90BEFFFA, 0xA4506CEB, 0xBEF9A3F7, 0xC67178F2,
+)
+# fmt: on
+
+blockSize = 64
+
+
+def _compress(h, block):
+    """
+    Return the hash words after one 64 byte block.
+    """
+    w = list(struct.unpack(">16I", block))
+    for i in range(16, 64):
+        x = w[i - 15]
+        y = w[i - 2]
+        s0 = ((x >> 7 | x << 25) ^ (x >> 18 | x << 14) ^ (x >> 3)) & 0xFFFFFFFF
+        s1 = ((y >> 17 | y << 15) ^ (y >> 19 | y << 13) ^ (y >> 10)) & 0xFFFFFFFF
+        w.append((w[i - 16] + s0 + w[i - 7] + s1) & 0xFFFFFFFF)
+
+    a, b, c, d, e, f, g, hh = h
+    for k, x in zip(constants, w):
+        s1 = (e >> 6 | e << 26) ^ (e >> 11 | e << 21) ^ (e >> 25 | e << 7)
+        t1 = (hh + (s1 & 0xFFFFFFFF) + ((e & f) ^ (~e & g)) + k + x) & 0xFFFFFFFF
+        s0 = (a >> 2 | a << 30) ^ (a >> 13 | a << 19) ^ (a >> 22 | a << 10)
+        t2 = ((s0 & 0xFFFFFFFF) + ((a & b) ^ (a & c) ^ (b & c))) & 0xFFFFFFFF
+        hh, g, f, e = g, f, e, (d + t1) & 0xFFFFFFFF
+        d, c, b, a = c, b, a, (t1 + t2) & 0xFFFFFFFF
+
+    return [(x + y) & 0xFFFFFFFF for x, y in zip(h, (a, b, c, d, e, f, g, hh))]
+
+
+class pySha256:
+    """
+    A sha256 hash in pure Python, with a state that can be exported.
+
+    It has the hashlib interface (update, digest, hexdigest and copy), and
+    state returns (words, length, pending): the hash words, the number of
+    bytes hashed and the bytes that don't fill a block yet.
+    """
+
+    name = "sha256"
+    digest_size = 32
+    block_size = blockSize
+
+    def __init__(self, state=None):
+        words, length, pending = state or (initial, 0, b"")
+        self.words = list(words)
+        self.length = length
+        self.pending = bytes(pending)
+
+    def state(self):
+        return list(self.words), self.length, self.pending
+
+    def copy(self):
+        return pySha256(self.state())
+
+    def update(self, content):
+        content = self.pending + bytes(content)
+        self.length += len(content) - len(self.pending)
+        end = len(content) - len(content) % blockSize
+        words = self.words
+        for start in range(0, end, blockSize):
+            words = _compress(words, content[start : start + blockSize])
+        self.words = words
+        self.pending = content[end:]
+
+    def digest(self):
+        padding = b"\x80" + b"\x00" * ((55 - self.length) % blockSize)
+        final = self.copy()
+        final.update(padding + struct.pack(">Q", self.length * 8))
+        return struct.pack(">8I", *final.words)
+
+    def hexdigest(self):
+        return self.digest().hex()
+
+
+class _context(ctypes.Structure):
+    """
+    The SHA256_CTX of libcrypto.
+    """
+
+    _fields_ = [
+        ("h", ctypes.c_uint32 * 8),
+        ("Nl", ctypes.c_uint32),
+        ("Nh", ctypes.c_uint32),
+        ("data", ctypes.c_uint8 * blockSize),
+        ("num", ctypes.c_uint32),
+        ("md_len", ctypes.c_uint32),
+    ]
+
+
+def _load_libcrypto():
+    """
+    Load libcrypto (OpenSSL) with the sha256 functions, or return None.
+
+    On macOS, the unversioned libcrypto of the system aborts the process
+    that loads it, so it's skipped.
+    """
+    name = ctypes.util.find_library("crypto")
+    if not name:
+        return None
+    if sys.platform == "darwin" and os.path.basename(name) == "libcrypto.dylib":
+        if os.path.dirname(name) in ("", "/usr/lib"):
+            return None
+    try:
+        lib = ctypes.CDLL(name)
+        for function, argtypes in [
+            ("SHA256_Init", [ctypes.POINTER(_context)]),
+            (
+                "SHA256_Update",
+                [ctypes.POINTER(_context), ctypes.c_void_p, ctypes.c_size_t],
+            ),
+            ("SHA256_Final", [ctypes.c_char_p, ctypes.POINTER(_context)]),
+        ]:
+            getattr(lib, function).argtypes = argtypes
+            getattr(lib, function).restype = ctypes.c_int
+    except (OSError, AttributeError):
+        return None
+    return lib
+
+
+# libcrypto once loaded (None if it can't be), False until it's first needed
+libcrypto = False
+
+
+def _libcrypto():
+    """
+    Load libcrypto on first use, and return it (or None).
+
+    A warning is logged (once) if it can't be used, as hashing in pure
+    Python is well under 1 MB/s.
+    """
+    global libcrypto
+    if libcrypto is False:
+        libcrypto = _load_libcrypto()
+        if libcrypto is not None and not _matches_hashlib():
+            libcrypto = None
+        if libcrypto is None:
+            bot.warning(
+                "libcrypto (OpenSSL) can't be used, so resumable sha256 "
+                "digests are computed in pure Python, which is very slow."
+            )
+    return libcrypto
+
+
+def _matches_hashlib():
+    """
+    Check that libcrypto (with our SHA256_CTX) hashes and restores as hashlib.
+    """
+    content = bytes(range(256)) * 3
+    expected = hashlib.sha256(content).digest()
+    hashObj = cSha256()
+    hashObj.update(content[:100])
+    restored = cSha256(hashObj.state())
+    restored.update(content[100:])
+    return hashObj.state()[1] == 100 and restored.digest() == expected
+
+
+class cSha256:
+    """
+    A sha256 hash computed by libcrypto, with a state that can be exported.
+
+    It has the same interface (and state) as pySha256.
+    """
+
+    name = "sha256"
+    digest_size = 32
+    block_size = blockSize
+
+    def __init__(self, state=None):
+        if libcrypto is False:
+            _libcrypto()
+        if libcrypto is None:
+            bot.exit("libcrypto (OpenSSL) is not available.")
+        self.context = _context()
+        libcrypto.SHA256_Init(self.context)
+        if state is not None:
+            words, length, pending = state
+            self.context.h[:] = list(words)
+            self.context.Nl = (length * 8) & 0xFFFFFFFF
+            self.context.Nh = (length * 8) >> 32
+            self.context.data[: len(pending)] = list(pending)
+            self.context.num = len(pending)
+
+    def state(self):
+        # The length (in bits) includes the pending bytes
+        length = (self.context.Nh << 32 | self.context.Nl) // 8
+        pending = bytes(self.context.data)[: self.context.num]
+        return list(self.context.h), length, pending
+
+    def copy(self):
+        copied = cSha256.__new__(cSha256)
+        copied.context = _context.from_buffer_copy(self.context)
+        return copied
+
+    def update(self, content):
+        if isinstance(content, bytes):
+            libcrypto.SHA256_Update(self.context, content, len(content))
+            return
+        view = memoryview(content).cast("B")
+        if view.readonly:
+            content = bytes(view)
+            libcrypto.SHA256_Update(self.context, content, len(content))
+        elif view.nbytes:
+            buffer = (ctypes.c_char * view.nbytes).from_buffer(view)
+            libcrypto.SHA256_Update(self.context, buffer, view.nbytes)
+
+    def digest(self):
+        result = ctypes.create_string_buffer(self.digest_size)
+        libcrypto.SHA256_Final(result, self.copy().context)
+        return result.raw
+
+    def hexdigest(self):
+        return self.digest().hex()
+
+
+def newSha256(state=None):
+    """
+    Return a sha256 hash that can export its state (from libcrypto if loaded).
+
+    libcrypto is loaded on the first call.
+    """
+    if libcrypto is False:
+        _libcrypto()
+    if libcrypto is not None:
+        return cSha256(state)
+    return pySha256(state)
+
+
+class resumableDigester(Struct):
+    """
+    A resumableDigester calculates a sha256 digest that can be checkpointed.
+
+    offset is the number of bytes written so far. Save a checkpoint next to
+    a partial blob, and restore it to go on from offset (e.g., with an http
+    Range request) without hashing the first part again.
+    """
+
+    def __init__(self, hashObj=None):
+        super().__init__()
+        self.alg = SHA256
+        self.hash = hashObj or newSha256()
+
+    @property
+    def offset(self):
+        return self.hash.state()[1]
+
+    def write(self, content):
+        """
+        Add bytes of content (or any bytes-like object) to the hash.
+        """
+        self.hash.update(content)
+
+    def readFrom(self, stream, chunk_size=1 << 20):
+        """
+        Write everything from a file-like object (opened in binary mode).
+        """
+        for chunk in readChunks(stream, chunk_size):
+            self.hash.update(chunk)
+        return self
+
+    def digest(self):
+        from .digest import NewDigest
+
+        return NewDigest(self.alg, self.hash)
+
+    def checkpoint(self, path):
+        """
+        Save the state of the hash (and offset) to a json file.
+
+        The file is replaced at once, so an interruption while saving keeps
+        the previous checkpoint.
+        """
+        words, length, pending = self.hash.state()
+        content = {
+            "algorithm": str(self.alg),
+            "offset": length,
+            "words": words,
+            "pending": pending.hex(),
+        }
+        partial = "%s.tmp" % path
+        with open(partial, "w") as fd:
+            fd.write(json.dumps(content))
+        os.replace(partial, path)
+
+    @classmethod
+    def restore(cls, path):
+        """
+        Restore a resumableDigester from a checkpoint saved to path.
+        """
+        with open(path) as fd:
+            content = json.loads(fd.read())
+        try:
+            state = (
+                content["words"],
+                content["offset"],
+                bytes.fromhex(content["pending"]),
+            )
+            valid = (
+                content["algorithm"] == SHA256
+                and len(state[0]) == 8
+                and len(state[2]) == state[1] % blockSize
+            )
+        except (KeyError, TypeError, ValueError):
+            valid = False
+        if not valid:
+            bot.exit("%s is not a valid sha256 checkpoint." % path)
+        return cls(newSha256(state))
@@ -5,33 +5,48 @@
 # with this file, You can obtain one at http://mozilla.org/MPL/2.0/.
 
 from opencontainers.struct import Struct
-from hashlib import new
 from .digest import Digest, NewDigest
 
 
 class hashVerifier(Struct):
+    """
+    A hashVerifier checks content written to it against an expected digest.
+
+    Each write only updates the hash, so content (e.g., a layer) can be
+    streamed through in chunks, and the digest is computed and compared once,
+    when verified is called. The expected digest can't be changed.
+    """
+
     def __init__(self, hashObj=None, digest=None):
 
         super().__init__()
 
         self.hash = hashObj
-        self.digest = digest
+        self._digest = digest
+
+    @property
+    def digest(self):
+        """
+        The expected digest.
+        """
+        return self._digest
 
     def write(self, content):
         """
         Add bytes of content to the hash object
+
+        Content can be any bytes-like object (bytes, bytearray, memoryview)
+        and isn't copied, or a string (encoded as utf-8).
         """
-        if not isinstance(content, bytes):
+        if isinstance(content, str):
             content = bytes(content, "utf-8")
         self.hash.update(content)
-        self.digest = NewDigest(self.digest.algorithm, self.hash)
-        self.digest.validate()
 
     def verified(self):
         """
         Calculate the hex digest against the digest
         """
-        return self.digest == NewDigest(self.digest.algorithm, self.hash)
+        return self._digest == NewDigest(self._digest.algorithm, self.hash)
 
 
 # The GoLang implementation has another Verifier class, not used here
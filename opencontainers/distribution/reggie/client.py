@@ -8,7 +8,7 @@ with this file, You can obtain one at http://mozilla.org/MPL/2.0/.
 
 """
 
-from .defaults import DEFAULT_USER_AGENT, URL_REGEX
+from .defaults import DEFAULT_USER_AGENT, URL_REGEXP
 from .request import RequestConfig, RequestClient
 from .config import BaseConfig
 from copy import deepcopy
@@ -55,7 +55,7 @@ class ClientConfig(BaseConfig):
         Custom validation on top of BaseConfig validation.
         """
         # Validation 2: Address starts with http
-        if not re.search(URL_REGEX, self.Address):
+        if not URL_REGEXP.search(self.Address):
             raise ValueError("%s does not appear to be a http address." % self.Address)
 
 
@@ -249,12 +249,15 @@ class NewClient:
         )
 
 
+# authHeaderRegexp matches the key="value" pairs of a Www-Authenticate header
+authHeaderRegexp = re.compile('([a-zA-z]+)="(.+?)"')
+
+
 def parseAuthHeader(authHeaderRaw):
     """
     Parse an authentication header into pieces
     """
-    regex = re.compile('([a-zA-z]+)="(.+?)"')
-    matches = regex.findall(authHeaderRaw)
+    matches = authHeaderRegexp.findall(authHeaderRaw)
     lookup = dict()
     for match in matches:
         lookup[match[0]] = match[1]
@@ -8,7 +8,7 @@ with this file, You can obtain one at http://mozilla.org/MPL/2.0/.
 
 """
 
-from .defaults import DEFAULT_USER_AGENT, URL_REGEX, VALID_METHODS
+from .defaults import DEFAULT_USER_AGENT, URL_REGEXP, VALID_METHODS
 from .config import BaseConfig
 from requests.cookies import cookiejar_from_dict
 from requests.adapters import HTTPAdapter
@@ -193,7 +193,7 @@ class RequestClient(requests.Session):
         """
         SetMethod sets the method for the request
         """
-        assert re.search(URL_REGEX, url)
+        assert URL_REGEXP.search(url)
         self.Request.url = url
         return self
 
@@ -263,16 +263,19 @@ class RequestClient(requests.Session):
         return response
 
 
+# unfilledTemplateRegexp matches template strings left in a request url
+unfilledTemplateRegexp = re.compile("<name>|<reference>|<digest>|<session_id>|//{2,}")
+
+
 def validateRequest(req):
     """
     Ensure that we have no unfilled template strings
     """
-    regex = re.compile("<name>|<reference>|<digest>|<session_id>|//{2,}")
     if not req.url:
         raise ValueError("A url is required to prepare a request.")
 
     if not req.method:
         raise ValueError("A method is required to prepare a request")
 
-    if regex.search(req.url):
+    if unfilledTemplateRegexp.search(req.url):
         raise ValueError("request is invalid")
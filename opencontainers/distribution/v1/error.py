@@ -42,7 +42,7 @@ class ErrorResponse(Struct):
 
     def Detail(self):
         """Detail returns an ErrorInfo"""
-        return self.attrs.get("Errors").value
+        return self.get("Errors")
 
 
 class ErrRegistry(Struct):
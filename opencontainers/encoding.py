@@ -0,0 +1,141 @@
+# Copyright (C) 2019-2022 Vanessa Sochat.
+
+# This Source Code Form is subject to the terms of the
+# Mozilla Public License, v. 2.0. If a copy of the MPL was not distributed
+# with this file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+# Encoding and decoding of json, with an optional faster backend.
+#
+# The fastest installed backend (orjson, rapidjson or ujson) is used to load
+# json and to write compact json, and the standard library json module is
+# used otherwise. Pretty printed json (with an indent) is always written by
+# the standard library, so it doesn't change with the backend. Compact output
+# has no whitespace and is utf-8 (not ascii escaped) for every backend.
+
+from opencontainers.logger import bot
+import json
+
+# Backends to try, in order of preference
+preferred = ["orjson", "rapidjson", "ujson", "json"]
+
+
+class Backend:
+    """
+    A Backend provides a compact dumps (to bytes or str) and loads.
+
+    If buffers is True, loads also accepts a memoryview (without a copy).
+    """
+
+    def __init__(self, name, dumps, loads, buffers=False):
+        self.name = name
+        self.dumps = dumps
+        self.loads = loads
+        self.buffers = buffers
+
+    def __str__(self):
+        return "<opencontainers.encoding.Backend-%s>" % self.name
+
+    def __repr__(self):
+        return self.__str__()
+
+
+def _orjson():
+    import orjson
+
+    def dumps(obj, sort_keys=False):
+        return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS if sort_keys else 0)
+
+    return Backend("orjson", dumps, orjson.loads, buffers=True)
+
+
+def _rapidjson():
+    import rapidjson
+
+    def dumps(obj, sort_keys=False):
+        return rapidjson.dumps(obj, ensure_ascii=False, sort_keys=sort_keys)
+
+    return Backend("rapidjson", dumps, rapidjson.loads)
+
+
+def _ujson():
+    import ujson
+
+    def dumps(obj, sort_keys=False):
+        return ujson.dumps(
+            obj, ensure_ascii=False, escape_forward_slashes=False, sort_keys=sort_keys
+        )
+
+    return Backend("ujson", dumps, ujson.loads)
+
+
+def _json():
+    def dumps(obj, sort_keys=False):
+        return json.dumps(
+            obj, separators=(",", ":"), ensure_ascii=False, sort_keys=sort_keys
+        )
+
+    return Backend("json", dumps, json.loads)
+
+
+backends = {"orjson": _orjson, "rapidjson": _rapidjson, "ujson": _ujson, "json": _json}
+
+
+def get_backend(name=None):
+    """
+    Get a backend by name, or the first one installed from preferred.
+    """
+    if name:
+        if name not in backends:
+            bot.exit("%s is not a known json backend." % name)
+        return backends[name]()
+
+    for name in preferred:
+        try:
+            return backends[name]()
+        except ImportError:
+            continue
+
+
+backend = get_backend()
+
+
+def set_backend(name=None):
+    """
+    Set the json backend by name (or reset to the preferred backend).
+    """
+    global backend
+    backend = get_backend(name)
+    return backend
+
+
+def dumps(obj, indent=None, sort_keys=False):
+    """
+    Serialize obj to a json string.
+
+    Without an indent, the output is compact and written by the backend.
+    """
+    if indent is not None:
+        return json.dumps(obj, indent=indent, sort_keys=sort_keys)
+    result = backend.dumps(obj, sort_keys=sort_keys)
+    if isinstance(result, bytes):
+        result = result.decode("utf-8")
+    return result
+
+
+def dumpb(obj, sort_keys=False):
+    """
+    Serialize obj to compact, utf-8 encoded json bytes.
+    """
+    result = backend.dumps(obj, sort_keys=sort_keys)
+    if isinstance(result, str):
+        result = result.encode("utf-8")
+    return result
+
+
+def loads(content):
+    """
+    Deserialize json content (str, bytes, bytearray or memoryview).
+    """
+    if isinstance(content, memoryview) and not backend.buffers:
+        content = content.tobytes()
+    return backend.loads(content)
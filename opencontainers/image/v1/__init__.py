@@ -19,7 +19,9 @@ from .annotations import (
     AnnotationDescription,
 )
 
-from .config import ImageConfig, RootFS, Image
+from .config import ImageConfig, RootFS, History, Image
+
+from .content import Content
 
 from .descriptor import Descriptor, Platform
 
@@ -41,3 +43,10 @@ from .mediatype import (
     MediaTypeImageLayerNonDistributableZstd,
     MediaTypeImageConfig,
 )
+
+# Use generated (specialized) load, validate and to_dict for the image types
+from opencontainers import codegen
+
+codegen.install(
+    Descriptor, Platform, Manifest, Index, ImageConfig, RootFS, History, Image
+)
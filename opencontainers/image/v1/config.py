@@ -6,6 +6,8 @@
 
 from opencontainers.struct import Struct
 from opencontainers.digest import Digest
+from .content import Content
+from .mediatype import MediaTypeImageConfig
 
 from datetime import datetime
 
@@ -126,7 +128,7 @@ class History(Struct):
         self.add("EmptyLayer", empty_layer)
 
 
-class Image(Struct):
+class Image(Content):
     """
     An Image Structure
 
@@ -135,6 +137,8 @@ class Image(Struct):
     mediatype when marshalled to JSON.
     """
 
+    mediaType = MediaTypeImageConfig
+
     def __init__(
         self,
         created=None,
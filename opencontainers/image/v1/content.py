@@ -0,0 +1,74 @@
+# Copyright (C) 2019-2022 Vanessa Sochat.
+
+# This Source Code Form is subject to the terms of the
+# Mozilla Public License, v. 2.0. If a copy of the MPL was not distributed
+# with this file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+from opencontainers.struct import Struct
+from opencontainers.digest import Canonical
+from .descriptor import Descriptor
+
+
+class Content(Struct):
+    """
+    Content is a structure that is pushed as a blob, and addressed by digest.
+
+    The canonical json and its digests are computed once, and kept until
+    the structure is changed (see Struct.validate for what is tracked). If the
+    structure was loaded from bytes (see Struct.from_json) and is unchanged,
+    the digest and descriptor are for the original bytes instead.
+    """
+
+    # The media type of the content, used for a descriptor
+    mediaType = None
+
+    # The validation stamp, canonical json and digests (by algorithm)
+    _content = None
+
+    def to_canonical_json(self):
+        """
+        Return the canonical json (bytes), computed once until changed.
+        """
+        content = self._content
+        if content is None or not self.validate() or content[0] != self._validated:
+            result = super().to_canonical_json()
+            content = self._content = (self._validated, result, {})
+        return content[1]
+
+    def digest(self, algorithm=None):
+        """
+        Return the Digest of the content, by default with Canonical.
+
+        The digest is computed once, until the structure is changed with add,
+        load, evolve or attrs. A value changed in place (e.g., a key set in the
+        dict returned by get("Annotations")) isn't seen, and the previous
+        digest is returned, so use add or evolve before pushing.
+        """
+        if self.raw is not None:
+            return self.raw_digest(algorithm)
+
+        algorithm = algorithm or Canonical
+        content = self.to_canonical_json()
+        digests = self._content[2]
+        digest = digests.get(algorithm)
+        if digest is None:
+            digest = digests[algorithm] = algorithm.fromBytes(content)
+        return digest
+
+    def descriptor(self, algorithm=None):
+        """
+        Return a new Descriptor (mediaType, digest and size) for the content.
+
+        As for digest, a value changed in place isn't seen, so the descriptor
+        would describe the previous bytes: use add or evolve instead.
+        """
+        content = self.raw
+        if content is None:
+            content = self.to_canonical_json()
+        return Descriptor.from_trusted_dict(
+            {
+                "mediaType": self.mediaType,
+                "digest": self.digest(algorithm),
+                "size": len(content),
+            }
+        )
@@ -4,15 +4,15 @@
 # Mozilla Public License, v. 2.0. If a copy of the MPL was not distributed
 # with this file, You can obtain one at http://mozilla.org/MPL/2.0/.
 
-from opencontainers.struct import Struct
 from opencontainers.image.specs import Versioned
 from opencontainers.logger import bot
 from .mediatype import MediaTypeImageIndex, MediaTypeImageManifest
+from .content import Content
 from .descriptor import Descriptor
 import re
 
 
-class Index(Struct):
+class Index(Content):
     """
     Index references manifests for various platforms.
 
@@ -20,6 +20,8 @@ class Index(Struct):
     mediatype when marshalled to JSON.
     """
 
+    mediaType = MediaTypeImageIndex
+
     def __init__(self, manifests=None, schemaVersion=None, annotations=None):
         super().__init__()
 
@@ -46,17 +48,15 @@ class Index(Struct):
         """
         valid_types = [MediaTypeImageManifest, MediaTypeImageIndex]
 
-        manifests = self.attrs.get("Manifests").value
+        manifests = self.get("Manifests")
         if manifests:
             for manifest in manifests:
-                mediaType = manifest.attrs.get("MediaType")
-                if mediaType.value not in valid_types:
+                mediaType = manifest.get("MediaType")
+                if mediaType not in valid_types:
 
                     # Case 1: it's a custom media type (allowed) but give warning
-                    if mediaType.validate_regexp(mediaType.value):
-                        bot.warning(
-                            "%s is valid, but not registered." % mediaType.value
-                        )
+                    if manifest.attrs["MediaType"].validate_regexp(mediaType):
+                        bot.warning("%s is valid, but not registered." % mediaType)
 
                     # Case 2: not valid and doesn't match regular expression
                     else:
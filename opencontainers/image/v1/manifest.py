@@ -4,12 +4,13 @@
 # Mozilla Public License, v. 2.0. If a copy of the MPL was not distributed
 # with this file, You can obtain one at http://mozilla.org/MPL/2.0/.
 
-from opencontainers.struct import Struct
 from opencontainers.image.specs import Versioned
 from opencontainers.logger import bot
+from .content import Content
 from .descriptor import Descriptor
 from .mediatype import (
     MediaTypeImageConfig,
+    MediaTypeImageManifest,
     MediaTypeImageLayer,
     MediaTypeImageLayerGzip,
     MediaTypeImageLayerZstd,
@@ -19,7 +20,7 @@ from .mediatype import (
 )
 
 
-class Manifest(Struct):
+class Manifest(Content):
     """
     A Manifest Structure
 
@@ -27,6 +28,8 @@ class Manifest(Struct):
     mediatype structure when marshalled to JSON.
     """
 
+    mediaType = MediaTypeImageManifest
+
     def __init__(
         self, manifestConfig=None, layers=None, schemaVersion=None, annotations=None
     ):
@@ -68,13 +71,13 @@ class Manifest(Struct):
     def _validateConfigMediaType(self):
         """validate the config media type."""
         # The media type of the config must be for the config
-        manifestConfig = self.attrs.get("Config").value
+        manifestConfig = self.get("Config")
 
         # Missing config is not valid
         if not manifestConfig:
             return False
 
-        mediaType = manifestConfig.attrs.get("MediaType").value
+        mediaType = manifestConfig.get("MediaType")
         if not mediaType:
             return False
 
@@ -101,13 +104,13 @@ class Manifest(Struct):
         ]
 
         # No layers, not valid
-        layers = self.attrs.get("Layers").value
+        layers = self.get("Layers")
         if layers == None:
             return False
 
         # Check against valid mediaType Layers
         for layer in layers:
-            mediaType = layer.attrs.get("MediaType").value
+            mediaType = layer.get("MediaType")
             if mediaType not in layerMediaTypes:
                 bot.error("layer mediaType %s is invalid" % mediaType)
                 return False
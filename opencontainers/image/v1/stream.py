@@ -0,0 +1,192 @@
+# Copyright (C) 2019-2022 Vanessa Sochat.
+
+# This Source Code Form is subject to the terms of the
+# Mozilla Public License, v. 2.0. If a copy of the MPL was not distributed
+# with this file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+# Stream the descriptors of a (very large) index or manifest.
+#
+# An index or artifact manifest can have tens of thousands of entries, and
+# loading it means holding the whole json, then the whole dictionary, then
+# the structures. Here the json is read in chunks (from a file, an http
+# response, or any iterable of bytes) and each descriptor is decoded and
+# loaded on its own, so memory doesn't grow with the size of the document.
+
+from opencontainers.logger import bot
+from .descriptor import Descriptor
+
+import codecs
+import json
+import re
+
+# The keys of the descriptor lists in an Index and a Manifest
+descriptorKeys = ("manifests", "layers")
+
+whitespaceRegexp = re.compile(r"[ \t\n\r]*")
+
+
+def _chunks(source, chunk_size):
+    """
+    Yield chunks (bytes or str) from a file-like object or an iterable.
+    """
+    if isinstance(source, (bytes, bytearray, str)):
+        source = [source]
+    read = getattr(source, "read", None)
+    if read is None:
+        yield from source
+        return
+    while True:
+        chunk = read(chunk_size)
+        if not chunk:
+            return
+        yield chunk
+
+
+class Reader:
+    """
+    A Reader decodes json values one at a time from a stream of chunks.
+
+    The buffer only holds what was not consumed yet. Invalid json exits (as
+    with Struct.load) once the stream ends, or as soon as the value being
+    decoded is longer than limit characters (e.g., a runaway string).
+    """
+
+    def __init__(self, source, chunk_size=65536, limit=1 << 20):
+        self.chunks = _chunks(source, chunk_size)
+        self.decoder = codecs.getincrementaldecoder("utf-8")()
+        self.json = json.JSONDecoder()
+        self.limit = limit
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+
+    def more(self):
+        """
+        Read the next chunk into the buffer, return False at the end.
+        """
+        if self.eof:
+            return False
+        if self.pos:
+            self.buffer = self.buffer[self.pos :]
+            self.pos = 0
+        chunk = next(self.chunks, None)
+        if chunk is None:
+            self.eof = True
+            self.buffer += self.decoder.decode(b"", final=True)
+        elif isinstance(chunk, str):
+            self.buffer += chunk
+        else:
+            self.buffer += self.decoder.decode(chunk)
+        return True
+
+    def peek(self):
+        """
+        Skip whitespace, and return the next character ("" at the end).
+        """
+        while True:
+            self.pos = whitespaceRegexp.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self.more():
+                return ""
+
+    def expect(self, characters):
+        """
+        Consume the next character, which must be one of characters.
+        """
+        character = self.peek()
+        if not character or character not in characters:
+            bot.exit(
+                "Expected %s in json, found %r." % (" or ".join(characters), character)
+            )
+        self.pos += 1
+        return character
+
+    def value(self):
+        """
+        Decode the next json value.
+        """
+        self.peek()
+        while True:
+            try:
+                value, end = self.json.raw_decode(self.buffer, self.pos)
+
+                # A number (or literal) at the end of the buffer may go on
+                if end < len(self.buffer) or self.eof:
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError as e:
+                if self.eof or len(self.buffer) - self.pos > self.limit:
+                    bot.exit("Invalid json: %s" % e)
+            self.more()
+
+    def end(self):
+        """
+        Check that nothing but whitespace is left after the json.
+        """
+        character = self.peek()
+        if character:
+            bot.exit("Unexpected %r after the end of the json." % character)
+
+
+def iter_descriptors(
+    source, keys=descriptorKeys, fields=None, validate=True, chunk_size=65536
+):
+    """
+    Yield the descriptors of an index (manifests) or manifest (layers).
+
+    The json is read from source in chunks: a file opened in binary (or
+    text) mode, bytes, or an iterable of chunks such as the iter_content of
+    an http response. Each descriptor is loaded (and validated, unless
+    validate is False, see Struct.from_trusted_dict) as it is read. Other
+    top level values (e.g., schemaVersion or config) are added to fields if
+    a dictionary is provided, and are complete once iteration is done.
+    Malformed json (including anything after the document) exits, as with
+    Struct.load.
+
+    Parameters
+    ==========
+    source: a file-like object, bytes, or an iterable of bytes (or str)
+    keys: the top level key (or keys) of the descriptor list
+    fields: a dictionary to add other top level values to
+    validate: if False, trust the descriptors (don't validate them)
+    chunk_size: the number of bytes to read from a file at once
+    """
+    if isinstance(keys, str):
+        keys = (keys,)
+
+    def load(content):
+        if validate:
+            return Descriptor().load(content)
+        return Descriptor.from_trusted_dict(content)
+
+    reader = Reader(source, chunk_size=chunk_size)
+    reader.expect("{")
+    if reader.peek() == "}":
+        reader.pos += 1
+        reader.end()
+        return
+
+    while True:
+        key = reader.value()
+        if not isinstance(key, str):
+            bot.exit("Expected a key in json, found %r." % key)
+        reader.expect(":")
+
+        if key in keys and reader.peek() == "[":
+            reader.pos += 1
+            if reader.peek() == "]":
+                reader.pos += 1
+            else:
+                while True:
+                    yield load(reader.value())
+                    if reader.expect(",]") == "]":
+                        break
+        elif fields is not None:
+            fields[key] = reader.value()
+        else:
+            reader.value()
+
+        if reader.expect(",}") == "}":
+            reader.end()
+            return
@@ -0,0 +1,248 @@
+# Copyright (C) 2019-2022 Vanessa Sochat.
+
+# This Source Code Form is subject to the terms of the
+# Mozilla Public License, v. 2.0. If a copy of the MPL was not distributed
+# with this file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+# A columnar table of descriptors, for analytics over many manifests.
+#
+# Loading every manifest of a registry as structures means millions of
+# Descriptor objects. A DescriptorTable instead keeps one array (column) per
+# field, with digests and media types stored as integer codes, and is built
+# directly from the manifest (or index) json. Group by and dedupe operations
+# use NumPy if it is installed, and plain Python otherwise.
+
+from opencontainers.logger import bot
+from opencontainers import encoding
+from array import array
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# What a descriptor is in the document it was found in
+roles = ("config", "layer", "manifest")
+
+
+class DescriptorTable:
+    """
+    A DescriptorTable holds descriptors as columns (arrays) of equal length.
+
+    sizes: the size of each descriptor
+    digests: the code of the digest (see digest)
+    media_types: the code of the media type (see media_type)
+    manifests: the id of the manifest (or index) it is in (see name)
+    roles: the code of the role (config, layer or manifest, see roles)
+    """
+
+    def __init__(self):
+        self.sizes = array("q")
+        self.digests = array("i")
+        self.media_types = array("i")
+        self.manifests = array("i")
+        self.roles = array("B")
+
+        # The values for each code, and the code for each value
+        self.digest_values = []
+        self.digest_codes = {}
+        self.media_type_values = []
+        self.media_type_codes = {}
+        self.names = []
+
+    def __len__(self):
+        return len(self.sizes)
+
+    def __str__(self):
+        return "<opencontainers.image.v1.table.DescriptorTable-%s>" % len(self)
+
+    def __repr__(self):
+        return self.__str__()
+
+    def _code(self, value, values, codes):
+        code = codes.get(value)
+        if code is None:
+            code = codes[value] = len(values)
+            values.append(value)
+        return code
+
+    def _append(self, content, manifest, role):
+        """
+        Append one descriptor (a dictionary) to the columns.
+        """
+        try:
+            size = content["size"]
+            digest = content["digest"]
+            mediaType = content["mediaType"]
+        except (KeyError, TypeError):
+            bot.exit("%s is not a valid descriptor." % (content,))
+        if (
+            not isinstance(size, int)
+            or not isinstance(digest, str)
+            or not isinstance(mediaType, str)
+        ):
+            bot.exit("%s is not a valid descriptor." % (content,))
+
+        self.sizes.append(size)
+        self.digests.append(self._code(digest, self.digest_values, self.digest_codes))
+        self.media_types.append(
+            self._code(mediaType, self.media_type_values, self.media_type_codes)
+        )
+        self.manifests.append(manifest)
+        self.roles.append(role)
+
+    def add(self, content, name=None):
+        """
+        Add the descriptors of a manifest (config and layers) or an index.
+
+        Content is a dictionary or json (str or bytes), and the descriptors
+        are not loaded as structures (or validated, beyond their fields).
+        Return the id of the manifest, and name (e.g., the manifest digest)
+        is kept for it.
+        """
+        if not isinstance(content, dict):
+            content = encoding.loads(content)
+        if not isinstance(content, dict):
+            bot.exit("Please provide a dictionary to load.")
+
+        manifest = len(self.names)
+        self.names.append(name)
+        if "manifests" in content:
+            for entry in content["manifests"] or []:
+                self._append(entry, manifest, 2)
+        else:
+            if content.get("config") is not None:
+                self._append(content["config"], manifest, 0)
+            for layer in content.get("layers") or []:
+                self._append(layer, manifest, 1)
+        return manifest
+
+    def digest(self, row):
+        """
+        Return the digest (a string) of a row.
+        """
+        return self.digest_values[self.digests[row]]
+
+    def media_type(self, row):
+        """
+        Return the media type of a row.
+        """
+        return self.media_type_values[self.media_types[row]]
+
+    def name(self, row):
+        """
+        Return the name of the manifest a row is in.
+        """
+        return self.names[self.manifests[row]]
+
+    def columns(self):
+        """
+        Return (a copy of) the columns as NumPy arrays.
+
+        The arrays are copies, so rows can still be added to the table while
+        they are held.
+        """
+        return {name: column.copy() for name, column in self._columns().items()}
+
+    def _columns(self):
+        """
+        Return the columns as NumPy arrays, without a copy.
+
+        The arrays are views of the table, which can't grow while they are
+        held (add would raise a BufferError), so only keep them in a call.
+        """
+        if numpy is None:
+            bot.exit("NumPy is required for columns, pip install numpy")
+        return {
+            name: numpy.frombuffer(column, dtype=column.typecode)
+            for name, column in [
+                ("sizes", self.sizes),
+                ("digests", self.digests),
+                ("media_types", self.media_types),
+                ("manifests", self.manifests),
+                ("roles", self.roles),
+            ]
+        }
+
+    def _role(self, role):
+        if role is None:
+            return None
+        if role not in roles:
+            bot.exit("%s is not a role, choices are %s" % (role, ", ".join(roles)))
+        return roles.index(role)
+
+    def _selected(self, role):
+        """
+        Return the NumPy columns, only with rows of a role (if provided).
+        """
+        columns = self._columns()
+        if role is not None:
+            keep = columns["roles"] == role
+            columns = {name: column[keep] for name, column in columns.items()}
+        return columns
+
+    def size_by_media_type(self, role=None):
+        """
+        Return the total size for each media type, e.g., of layers.
+        """
+        role = self._role(role)
+        totals = [0] * len(self.media_type_values)
+
+        if numpy is not None and len(self):
+            columns = self._selected(role)
+            sums = numpy.zeros(len(totals), dtype=numpy.int64)
+            numpy.add.at(sums, columns["media_types"], columns["sizes"])
+            totals = sums.tolist()
+        else:
+            for size, code, current in zip(self.sizes, self.media_types, self.roles):
+                if role is None or current == role:
+                    totals[code] += size
+
+        return {
+            mediaType: total
+            for mediaType, total in zip(self.media_type_values, totals)
+            if total
+        }
+
+    def unique_size(self, role=None):
+        """
+        Return the total size of distinct digests (e.g., stored layers).
+        """
+        role = self._role(role)
+        if numpy is not None and len(self):
+            columns = self._selected(role)
+            _, first = numpy.unique(columns["digests"], return_index=True)
+            return int(columns["sizes"][first].sum())
+
+        sizes = {}
+        for size, digest, current in zip(self.sizes, self.digests, self.roles):
+            if role is None or current == role:
+                sizes.setdefault(digest, size)
+        return sum(sizes.values())
+
+    def shared_digests(self, role=None, minimum=2):
+        """
+        Return the number of manifests for digests in at least minimum.
+        """
+        role = self._role(role)
+        if numpy is not None and len(self):
+            columns = self._selected(role)
+            count = max(len(self.names), 1)
+            pairs = columns["digests"].astype(numpy.int64) * count
+            pairs = numpy.unique(pairs + columns["manifests"])
+            counts = numpy.bincount(pairs // count, minlength=len(self.digest_values))
+            codes = numpy.flatnonzero(counts >= minimum)
+            return {self.digest_values[code]: int(counts[code]) for code in codes}
+
+        pairs = set()
+        for digest, manifest, current in zip(self.digests, self.manifests, self.roles):
+            if role is None or current == role:
+                pairs.add((digest, manifest))
+        counts = {}
+        for digest, _ in pairs:
+            counts[digest] = counts.get(digest, 0) + 1
+        return {
+            self.digest_values[code]: total
+            for code, total in counts.items()
+            if total >= minimum
+        }
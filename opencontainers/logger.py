@@ -4,6 +4,7 @@
 # Mozilla Public License, v. 2.0. If a copy of the MPL was not distributed
 # with this file, You can obtain one at http://mozilla.org/MPL/2.0/.
 
+from contextlib import contextmanager
 import logging as _logging
 import platform
 import sys
@@ -120,6 +121,30 @@ class Logger:
         self.handler(dict(level="error", msg=msg))
         sys.exit(return_code)
 
+    @contextmanager
+    def capture(self):
+        """
+        Collect error messages in a list instead of logging them.
+
+        Other messages are handled as usual. This is used to validate many
+        structures, where bot.exit is caught (SystemExit) for each one.
+        """
+        errors = []
+        handlers = self.log_handler
+
+        def handler(msg):
+            if msg["level"] == "error":
+                errors.append(msg["msg"])
+                return
+            for handler in handlers:
+                handler(msg)
+
+        self.log_handler = [handler]
+        try:
+            yield errors
+        finally:
+            self.log_handler = handlers
+
     def progress(self, done=None, total=None):
         self.handler(dict(level="progress", done=done, total=total))
 
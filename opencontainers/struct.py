@@ -5,34 +5,86 @@
 # with this file, You can obtain one at http://mozilla.org/MPL/2.0/.
 
 from opencontainers.logger import bot
-from datetime import datetime
-import copy
-import json
+from opencontainers import encoding
+from collections.abc import Mapping
+from datetime import datetime, timedelta, timezone
+import functools
+import itertools
 import re
 
+# Validation stamps are increasing, so a structure validated after another
+# always has a larger stamp. Zero means not validated (or changed since).
+validation_stamps = itertools.count(1)
+
+
+# An RFC 3339 timestamp, e.g., 2015-10-31T22:22:56.015925234Z
+RFC3339Regexp = re.compile(
+    r"^([0-9]{4})-([0-9]{2})-([0-9]{2})[Tt]([0-9]{2}):([0-9]{2}):([0-9]{2})"
+    r"(?:\.([0-9]+))?(?:[Zz]|([+-])([0-9]{2}):([0-9]{2}))$"
+)
+
+
+@functools.lru_cache(maxsize=4096)
+def parse_datetime(value):
+    """
+    Parse an RFC 3339 timestamp into a (timezone aware) datetime.
+
+    Fractional seconds past microseconds (e.g., the nanoseconds that Go
+    writes) are truncated, and a leap second is read as second 59. Results
+    are cached, as the same timestamps are often parsed many times (e.g.,
+    when an image is loaded, validated and serialized). Raise a ValueError
+    if the timestamp is not valid.
+    """
+    match = RFC3339Regexp.match(value)
+    if not match:
+        raise ValueError("%s is not an RFC 3339 timestamp." % value)
+    year, month, day, hour, minute, second, fraction, sign, hours, minutes = (
+        match.groups()
+    )
+
+    tz = timezone.utc
+    if sign:
+        hours, minutes = int(hours), int(minutes)
+        if hours > 23 or minutes > 59:
+            raise ValueError("%s has an invalid offset." % value)
+        offset = timedelta(hours=hours, minutes=minutes)
+        tz = timezone(-offset if sign == "-" else offset)
+
+    # Only a leap second (60) is past 59
+    second = int(second)
+    if second > 60:
+        raise ValueError("%s has an invalid second." % value)
+
+    microsecond = int(fraction[:6].ljust(6, "0")) if fraction else 0
+    return datetime(
+        int(year),
+        int(month),
+        int(day),
+        int(hour),
+        int(minute),
+        min(second, 59),
+        microsecond,
+        tzinfo=tz,
+    )
+
 
 def is_struct(attType):
     """
     Determine if an attType is another struct we need to populate
     """
-    try:
-        return (
-            Struct in attType.__bases__
-            or StrStruct in attType.__bases__
-            or IntStruct in attType.__bases__
-        )
-    except:
-        return False
+    return isinstance(attType, type) and issubclass(attType, Struct)
 
 
 class StructAttr:
     """
     A base structure for an opencontainers attribute.
 
-    A struct attribute holds a name, jsonName, value, attribute type,
-    and if it's required or not. The name should hold the parameter name
-    as reflected in the original (usually GoLang) implementation, while
-    the jsonName is how it should be serialized to json.
+    A struct attribute holds a name, jsonName, attribute type, and if it's
+    required or not. The name should hold the parameter name as reflected in
+    the original (usually GoLang) implementation, while the jsonName is how it
+    should be serialized to json. An attribute is only a definition: it is
+    created once per Struct class (see Schema) and shared by all instances,
+    which hold their own values.
 
     Parameters
     ==========
@@ -40,8 +92,9 @@ class StructAttr:
     attType: the attribute type (a python type), can be provided in list
     required: boolean if required or not
     jsonName: the name to serialize to json (not required, will use name)
-    value: optionally, provide a value on init
     omitempty: if true, don't serialize with response.
+    regexp: if a string is provided as the type (or nested), check against
+    hide: if true, never serialize the attribute
     """
 
     def __init__(
@@ -50,16 +103,11 @@ class StructAttr:
         attType,
         required,
         jsonName=None,
-        value=None,
         omitempty=True,
         regexp=None,
         hide=False,
     ):
         self.name = name
-        if isinstance(attType, list) and value is None:
-            self.value = []
-        else:
-            self.value = value
         self.attType = attType
         self.required = required
         self.regexp = regexp or ""
@@ -67,93 +115,133 @@ class StructAttr:
         self.omitempty = omitempty
         self.hide = hide
 
+        # The position of the value in a Struct, set by the Schema
+        self.index = None
+
+        # Everything below is derived once, so instances don't need to
+        self.is_list = isinstance(attType, list)
+        self.pattern = re.compile(self.regexp) if self.regexp else None
+
+        # The struct type to populate, either directly or as list entries
+        self.child = None
+        if is_struct(attType):
+            self.child = attType
+        elif self.is_list and attType and is_struct(attType[0]):
+            self.child = attType[0]
+
+        # A nested struct that can change (StrStruct and IntStruct cannot)
+        self.mutable = self.child is not None and not issubclass(self.child, (str, int))
+
     def __str__(self):
-        return "<opencontainers.struct.StructAttr-%s:%s>" % (self.name, self.value)
+        return "<opencontainers.struct.StructAttr-%s>" % self.name
 
     def __repr__(self):
         return self.__str__()
 
+    def matches(self, attType, required, jsonName, omitempty, regexp, hide):
+        """
+        Determine if the attribute has the same definition as provided.
+        """
+        return (
+            self.attType == attType
+            and self.required == required
+            and self.jsonName == (jsonName or self.name)
+            and self.omitempty == omitempty
+            and self.regexp == (regexp or "")
+            and self.hide == hide
+        )
+
     def _is_struct(self, attType=None):
         """
         Determine if an attType is another struct we need to populate
         """
         # We can provide a nested attType to check
         if not attType:
-            attType = self.attType
+            return self.child is not None and not self.is_list
         return is_struct(attType)
 
-    def set(self, value):
+    def default(self):
         """
-        Set a new value, and validate the type. Return true if set
+        The value an attribute holds before anything is added.
         """
+        if self.is_list:
+            return []
+        return None
 
-        if not is_struct(type(value)):
-            # First pass, it might be another object to add
-            if self._is_struct():
-                newStruct = self.attType()
-                value = newStruct.load(value)
+    def empty(self):
+        """
+        The "empty" value to serialize for an unset attribute (mirrors Go)
+        """
+        if self.is_list or self.attType == list:
+            return []
+        if self.attType == dict:
+            return {}
+        if self.attType == str:
+            return ""
+        if self.attType == int:
+            return None
+        return []
+
+    def convert(self, value):
+        """
+        Convert a value to the attribute type, loading nested structures.
 
-            # If it's a list with another type
-            elif isinstance(self.attType, list) and self.attType:
-                child = self.attType[0]
+        Values that are already a struct are returned as is.
+        """
+        child = self.child
+        if child is None or is_struct(type(value)):
+            return value
 
-                # It's either a nested structure
-                if is_struct(child):
+        # Either a single nested structure
+        if not self.is_list:
+            return child().load(value)
 
-                    # If we have a list of values, generate them
-                    if isinstance(value, list):
-                        values = []
-                        for v in value:
-                            newStruct = child()
-                            values.append(newStruct.load(v))
-                        value = values
-                    else:
-                        newStruct = child()
-                        value = newStruct.load(value)
+        # Or a list of values to generate (keeping structures as they are)
+        if isinstance(value, list):
+            return [v if isinstance(v, Struct) else child().load(v) for v in value]
+        return child().load(value)
 
+    def check(self, value):
+        """
+        Check a (converted) value against the regular expression and type.
+        """
         # If we have a string with a regular expression
         if not self.validate_regexp(value):
             return False
+        return self.validate_type(value)
 
-        if self.validate_type(value):
-            self.value = value
-            return True
-        return False
-
-    def to_dict(self):
+    def to_dict(self, value):
         """
-        Return a dictionary representation of the attribute.
+        Return a dictionary representation of a value for the attribute.
 
         This won't be called unless the attribute in question is a struct.
         """
-        if isinstance(self.value, (str, int)):
-            return self.value
+        if isinstance(value, (str, int)):
+            return value
 
-        if isinstance(self.value, list):
+        if isinstance(value, list):
             items = []
-            for item in self.value:
+            for item in value:
                 if isinstance(item, (str, int)):
                     items.append(item)
-                elif isinstance(item, (Struct, StrStruct, IntStruct)):
+                elif isinstance(item, Struct):
                     items.append(item.to_dict())
                 else:
                     items.append(item)
             return items
 
-        return self.value.to_dict()
+        return value.to_dict()
 
     def validate_datetime(self, value):
         """
-        Validate a datetime string.
+        Validate a datetime string, an RFC 3339 timestamp.
 
-        This function is generous to only check day, month, year.
-        This is a road nobody wants to go down.
+        e.g., "2015-10-31T22:22:56.015925234Z" (see parse_datetime)
         """
-        value = value.split("T")[0]
-        try:  # "2015-10-31T22:22:56.015925234Z"
-            datetime.strptime(value, "%Y-%m-%d")
+        try:
+            parse_datetime(value)
             return True
-        except ValueError:
+        except (TypeError, ValueError):
             return False
 
     def validate_regexp(self, value):
@@ -162,7 +250,7 @@ class StructAttr:
 
         Return True if valid or not applicable, False otherwise
         """
-        if not self.regexp:
+        if not self.pattern:
             return True
 
         # Only need to look at immediate children
@@ -171,7 +259,7 @@ class StructAttr:
 
         for entry in value:
             if isinstance(entry, str):
-                if not re.search(self.regexp, entry):
+                if not self.pattern.search(entry):
                     bot.error("%s failed regex validation %s " % (entry, self.regexp))
                     return False
         return True
@@ -184,7 +272,7 @@ class StructAttr:
         type we are checking.
         """
         # If it's a list with something inside
-        if isinstance(self.attType, list):
+        if self.is_list:
 
             # If value not a list, invalid
             if not isinstance(value, list):
@@ -208,6 +296,275 @@ class StructAttr:
         return True
 
 
+class Schema:
+    """
+    A Schema is the compiled set of attributes for a Struct class.
+
+    The first instance of a class records its newAttr declarations here,
+    and the schema is then shared by every following instance so that
+    attributes, the jsonName lookup and regular expressions are only
+    built once. An instance that declares something different gets its
+    own copy. Each attribute has a fixed index, which is the position of
+    its value in the list of values an instance holds.
+    """
+
+    def __init__(self):
+        self.attrs = {}
+        self.json = {}
+        self.lists = []
+        self.nested = []
+        self.sealed = False
+
+    def add(self, attr):
+        """
+        Add (or replace) an attribute definition, keeping its index.
+        """
+        previous = self.attrs.get(attr.name)
+        if previous is not None:
+            attr.index = previous.index
+            del self.json[previous.jsonName]
+            if previous.is_list:
+                self.lists.remove(previous.index)
+            if previous.mutable:
+                self.nested.remove(previous.index)
+        else:
+            attr.index = len(self.attrs)
+        self.attrs[attr.name] = attr
+        self.json[attr.jsonName] = attr
+        if attr.is_list:
+            self.lists.append(attr.index)
+        if attr.mutable:
+            self.nested.append(attr.index)
+
+    def copy(self):
+        """
+        Return an unsealed copy of the schema.
+        """
+        schema = Schema()
+        for attr in self.attrs.values():
+            schema.add(attr)
+        return schema
+
+    def new_values(self):
+        """
+        Return the initial values for a new instance.
+        """
+        values = [None] * len(self.attrs)
+        for index in self.lists:
+            values[index] = []
+        return values
+
+
+class BoundAttr:
+    """
+    A BoundAttr pairs an attribute definition with the value of one instance.
+
+    This is what Struct.attrs returns, so that code written against
+    attrs[name].value continues to work.
+    """
+
+    def __init__(self, struct, attr):
+        self._struct = struct
+        self._attr = attr
+
+    def __getattr__(self, name):
+        return getattr(self._attr, name)
+
+    def __str__(self):
+        return "<opencontainers.struct.StructAttr-%s:%s>" % (self.name, self.value)
+
+    def __repr__(self):
+        return self.__str__()
+
+    @property
+    def value(self):
+        return self._struct._values[self._attr.index]
+
+    @value.setter
+    def value(self, value):
+        self._struct._changed()
+        self._struct._values[self._attr.index] = value
+
+    def set(self, value):
+        """
+        Set a new value, and validate the type. Return true if set
+        """
+        return self._struct._set(self._attr, value)
+
+    def to_dict(self):
+        return self._attr.to_dict(self.value)
+
+
+# Attributes that __reduce__ ships as arguments (or drops, for caches)
+_unpickled = {"_values", "_validated", "_schema", "_raw", "_content", "_hash"}
+
+
+def _restore(cls, values, validated, schema=None, state=None):
+    """
+    Create a structure from pickled values (see Struct.__reduce__).
+    """
+    self = cls.__new__(cls)
+    if schema is None:
+        cls.compiled_schema()
+    else:
+        self._schema = schema
+    self._values = list(values)
+    if state:
+        self.__dict__.update(state)
+
+    # Nested structures are restored first, so their stamps are older
+    if validated:
+        self._validated = next(validation_stamps)
+    return self
+
+
+def _copied(value):
+    """
+    Return a shallow copy of a list or dictionary value (for Struct.clone).
+
+    Nested structures are not copied, and entries of a LazyStructList that
+    were not created yet stay that way.
+    """
+    if isinstance(value, LazyStructList):
+        return LazyStructList(value.child, list.__iter__(value))
+    if isinstance(value, list):
+        return list(value)
+    if isinstance(value, dict):
+        return dict(value)
+    return value
+
+
+def _frozen(value):
+    """
+    Return a hashable version of a value (a list or dictionary) of a Struct.
+    """
+    if isinstance(value, list):
+        return tuple(_frozen(item) for item in value)
+    if isinstance(value, dict):
+        return frozenset((key, _frozen(item)) for key, item in value.items())
+    return value
+
+
+class LazyStructList(list):
+    """
+    A list of nested structures that are created on first access.
+
+    The list starts with the (trusted) content of each structure, and an
+    entry is replaced with its structure (see Struct.from_trusted_dict) the
+    first time it is accessed. Use content to look at an entry without
+    creating it, e.g., to find the manifest for one platform in an Index:
+
+        manifests = index.get("Manifests")
+        for i in range(len(manifests)):
+            if manifests.content(i).get("platform", {}).get("os") == "linux":
+                return manifests[i]
+
+    Operations that compare, copy or search entries create all of them first.
+    """
+
+    def __init__(self, child, items=()):
+        super().__init__(items)
+        self.child = child
+
+    def _create(self, index):
+        item = list.__getitem__(self, index)
+        if not isinstance(item, Struct):
+            item = self.child.from_trusted_dict(item, lazy=True)
+            list.__setitem__(self, index, item)
+        return item
+
+    def _create_all(self):
+        for index in range(len(self)):
+            self._create(index)
+        return self
+
+    def content(self, index):
+        """
+        Return the content (a dictionary) of an entry, without creating it.
+        """
+        item = list.__getitem__(self, index)
+        if isinstance(item, Struct):
+            return item.to_dict()
+        return item
+
+    def created(self):
+        """
+        Return the number of entries that have been created.
+        """
+        return sum(1 for item in list.__iter__(self) if isinstance(item, Struct))
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._create(i) for i in range(*index.indices(len(self)))]
+        return self._create(index)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self._create(index)
+
+    def __reversed__(self):
+        for index in reversed(range(len(self))):
+            yield self._create(index)
+
+    def pop(self, index=-1):
+        item = self._create(index)
+        list.pop(self, index)
+        return item
+
+    def __contains__(self, item):
+        return list.__contains__(self._create_all(), item)
+
+    def __eq__(self, other):
+        if isinstance(other, LazyStructList):
+            other._create_all()
+        return list.__eq__(self._create_all(), other)
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        return result if result is NotImplemented else not result
+
+    def __add__(self, other):
+        return list(self._create_all()) + other
+
+    def copy(self):
+        return list(self._create_all())
+
+    def count(self, item):
+        return list.count(self._create_all(), item)
+
+    def index(self, item, *args):
+        return list.index(self._create_all(), item, *args)
+
+    def remove(self, item):
+        list.remove(self._create_all(), item)
+
+    def sort(self, *args, **kwargs):
+        list.sort(self._create_all(), *args, **kwargs)
+
+    def __reduce__(self):
+        # Entries that were not created are shipped (and stay) as content
+        return (LazyStructList, (self.child, list(list.__iter__(self))))
+
+
+class AttrsView(Mapping):
+    """
+    A read only mapping of attribute names to a BoundAttr for a Struct.
+    """
+
+    def __init__(self, struct, lookup):
+        self._struct = struct
+        self._lookup = lookup
+
+    def __getitem__(self, name):
+        return BoundAttr(self._struct, self._lookup[name])
+
+    def __iter__(self):
+        return iter(self._lookup)
+
+    def __len__(self):
+        return len(self._lookup)
+
+
 class Struct:
     """
     A general base class to print and validate attributes.
@@ -215,11 +572,120 @@ class Struct:
     a Struct is a general base class that allows for printing
     and validating a set of attributes according to their defined subclass.
     the subclass should have an init function that uses the functions
-    here to add required attributes.
+    here to add required attributes. The attributes are compiled into a
+    Schema for the class once, and instances only store a list of values,
+    ordered by attribute index.
     """
 
+    # A Struct without attributes (e.g., a StrStruct) doesn't need values.
+    # An instance only sets its own _schema if it declares different attributes
+    _values = ()
+
+    # The stamp of the last successful validation, reset on any change
+    _validated = 0
+
+    # The original json (with its stamp and digests) if loaded from bytes
+    _raw = None
+
+    # The hash, once computed the structure is frozen
+    _hash = None
+
+    def __init_subclass__(cls, **kwargs):
+        """
+        Seal the schema of a class once its first instance is constructed.
+
+        The __init__ of each subclass is wrapped, and the outermost one (the
+        __init__ of the class being created) seals the schema when it
+        returns, so an attribute declared later (e.g., with newAttr on the
+        first instance) goes to a copy for that instance only.
+        """
+        super().__init_subclass__(**kwargs)
+        init = cls.__dict__.get("__init__")
+        if init is None:
+            return
+
+        @functools.wraps(init)
+        def __init__(self, *args, **kwargs):
+            init(self, *args, **kwargs)
+            current = type(self)
+            if current.__init__ is __init__:
+                schema = current.__dict__.get("_schema")
+                if schema is not None:
+                    schema.sealed = True
+
+        cls.__init__ = __init__
+
     def __init__(self):
-        self.attrs = {}
+        cls = type(self)
+        schema = cls.__dict__.get("_schema")
+
+        # The first instance of a class compiles the schema
+        if schema is None:
+            cls._schema = Schema()
+
+        # Any later instance can reuse it
+        elif schema.attrs:
+            self._values = schema.new_values()
+
+    @classmethod
+    def compiled_schema(cls):
+        """
+        Return the compiled schema for the class.
+
+        If no instance of the class has been created yet, one is created to
+        record the attributes. A class used here must take no required
+        arguments (true for all opencontainers structures).
+        """
+        schema = cls.__dict__.get("_schema")
+        if schema is None:
+            cls()
+            schema = cls.__dict__["_schema"]
+        schema.sealed = True
+        return schema
+
+    @classmethod
+    def from_trusted_dict(cls, content, lazy=False):
+        """
+        Create a new structure from trusted content, without validation.
+
+        This is a fast path for content that is known to be valid (e.g.,
+        a manifest that was just pulled and verified against its digest).
+        The tree of structures is built in a single pass, and there are no
+        type, regular expression or custom (_validate) checks. Use load for
+        anything else.
+
+        If lazy is True, lists of nested structures (e.g., the manifests of
+        an Index or the layers of a Manifest) are a LazyStructList, and each
+        structure is only created when it is first accessed.
+        """
+        schema = cls.compiled_schema()
+        lookup = schema.json
+        values = [None] * len(schema.attrs)
+
+        for key, value in content.items():
+            attr = lookup.get(key)
+            if attr is None:
+                bot.exit("%s is not a valid json attribute." % key)
+            child = attr.child
+            if child is not None and value is not None:
+                if attr.is_list and lazy and attr.mutable:
+                    value = LazyStructList(child, value)
+                elif attr.is_list:
+                    value = [child.from_trusted_dict(v) for v in value]
+                else:
+                    value = child.from_trusted_dict(value, lazy)
+            values[attr.index] = value
+
+        self = cls.__new__(cls)
+        self._values = values
+        return self
+
+    @property
+    def attrs(self):
+        """
+        A lookup of attribute names to attributes (with values)
+        """
+        return AttrsView(self, self._schema.attrs)
 
     def newAttr(
         self,
@@ -247,7 +713,21 @@ class Struct:
         omitempty: if true, don't serialize with response.
         regexp: if a string is provided as the type (or nested), check against
         """
-        self.attrs[name] = StructAttr(
+        schema = self._schema
+
+        # A compiled schema already has the attribute, nothing to do
+        if schema.sealed:
+            attr = schema.attrs.get(name)
+            if attr is not None and attr.matches(
+                attType, required, jsonName, omitempty, regexp, hide
+            ):
+                return
+
+            # This instance is different from the class, give it its own
+            schema = schema.copy()
+            self._schema = schema
+
+        attr = StructAttr(
             name=name,
             attType=attType,
             required=required,
@@ -256,6 +736,13 @@ class Struct:
             regexp=regexp,
             hide=hide,
         )
+        schema.add(attr)
+
+        # Only the first instance (or one with its own schema) gets here
+        values = list(self._values)
+        values.extend([None] * (len(schema.attrs) - len(values)))
+        values[attr.index] = attr.default()
+        self._values = values
 
     def _clear_values(self):
         """
@@ -264,51 +751,221 @@ class Struct:
         if a load is done, we remove previously loaded values for any
         attributes
         """
-        for name, att in self.attrs.items():
-            self.attrs[name].value = None
+        self._changed()
+        self._values = [None] * len(self._schema.attrs)
+
+    def _set(self, attr, value):
+        """
+        Convert and validate a value for an attribute. Return true if set
+        """
+        value = attr.convert(value)
+        if attr.check(value):
+            self._changed()
+            self._values[attr.index] = value
+            return True
+        return False
+
+    def _changed(self):
+        """
+        Record a change to a value, a frozen (hashed) structure can't change.
+        """
+        if self._hash is not None:
+            bot.exit("%s is frozen (it was hashed), change a copy instead." % self)
+        self._validated = 0
+
+    def _items(self):
+        """
+        Return the (name, value) pairs that are set, for equality and hashing.
+
+        Empty values are skipped, as they are by to_dict.
+        """
+        return [
+            (name, value)
+            for name, value in zip(self._schema.attrs, self._values)
+            if value
+        ]
+
+    def __eq__(self, other):
+        """
+        Structures are equal if they have the same type and values.
+
+        A structure without attrs (that keeps its state elsewhere, e.g., a
+        digester) is only equal to itself.
+        """
+        if type(self) is not type(other):
+            return NotImplemented
+        if self is other:
+            return True
+        return bool(self._schema.attrs) and self._items() == other._items()
+
+    def __reduce__(self):
+        """
+        Pickle a structure as its class and values.
+
+        The compiled schema belongs to the class, so only the values (and
+        whether they were validated) are shipped, and a structure that was
+        valid isn't validated again when unpickled. Other attributes (e.g.,
+        the hash of a digester) are kept too, but caches (raw json, digests
+        and the hash) are not.
+        """
+        args = (type(self), tuple(self._values), self._is_validated())
+        schema = self.__dict__.get("_schema")
+        state = {
+            name: value
+            for name, value in self.__dict__.items()
+            if name not in _unpickled
+        }
+        if schema is not None or state:
+            args += (schema,)
+        if state:
+            args += (state,)
+        return (_restore, args)
+
+    def __hash__(self):
+        """
+        Hash a structure by its values.
+
+        A structure (and any structure nested in it) is frozen once hashed,
+        e.g., added to a set or an InternPool, so the hash can't change:
+        load, add and setting attrs will exit. As with validate, changing a
+        value in place (e.g., appending to a list returned by get) isn't
+        tracked, so don't do that. A structure without attrs is hashed by
+        identity (and isn't frozen).
+        """
+        if not self._schema.attrs:
+            return object.__hash__(self)
+        result = self._hash
+        if result is None:
+            items = tuple((name, _frozen(value)) for name, value in self._items())
+            result = self._hash = hash((type(self), items))
+        return result
+
+    def _is_validated(self):
+        """
+        Determine if the structure is unchanged since it was last validated.
+
+        Nested structures are checked too, at every level: they must have
+        been validated before (and not changed since) this one, otherwise a
+        change to a child (e.g., a layer mediaType, or the platform of an
+        index entry) could make this structure invalid.
+        """
+        stamp = self._validated
+        if not stamp:
+            return False
+        values = self._values
+        for index in self._schema.nested:
+            value = values[index]
+            if value is None:
+                continue
+            for child in value if isinstance(value, list) else [value]:
+                if not isinstance(child, Struct):
+                    return False
+                if not 0 < child._validated <= stamp:
+                    return False
+                if child._schema.nested and not child._is_validated():
+                    return False
+        return True
 
     def to_dict(self):
         """return a Struct as a dictionary, must be valid"""
-        # A lookup of "empty" values based on types (mirrors Go)
-        lookup = {str: "", int: None, list: [], dict: {}}
-
         if self.validate():
             result = {}
-            for name, att in self.attrs.items():
-
+            for att, value in zip(self._schema.attrs.values(), self._values):
                 # Don't show if unset and omit empty, OR marked to hide
-                if (not att.value and att.omitempty) or att.hide:
+                if (not value and att.omitempty) or att.hide:
                     continue
-                if not att.value:
-                    value = lookup.get(att.attType, [])
-                    result[att.jsonName] = value
+                if not value:
+                    result[att.jsonName] = att.empty()
                 else:
                     # If structure or list, call to_dict
-                    if att._is_struct() or isinstance(att.value, list):
-                        result[att.jsonName] = att.to_dict()
+                    if att.child is not None or isinstance(value, list):
+                        result[att.jsonName] = att.to_dict(value)
                     else:
-                        result[att.jsonName] = att.value
+                        result[att.jsonName] = value
 
             return result
 
-    def to_json(self):
+    def to_json(self, indent=4):
         """
         Get the dictionary of a struct and return pretty printed json
+
+        If indent is None, return compact json instead (written by the
+        fastest json backend that is installed, see opencontainers.encoding)
         """
         result = self.to_dict()
         if result:
-            result = json.dumps(result, indent=4)
+            result = encoding.dumps(result, indent=indent)
         return result
 
+    def to_canonical_json(self):
+        """
+        Return the canonical json (bytes) for a struct.
+
+        Canonical json is compact, utf-8 encoded and has sorted keys, so the
+        same content always gives the same bytes (and digest).
+        """
+        result = self.to_dict()
+        if result is None:
+            bot.exit("%s is invalid" % self)
+        return encoding.dumpb(result, sort_keys=True)
+
+    @classmethod
+    def from_json(cls, content, validate=True):
+        """
+        Create a new structure from json (str, bytes or memoryview).
+
+        If the json is bytes (or another bytes-like object) and validated,
+        a memoryview of it is kept (see raw) so the original payload and its
+        digest are available without serializing again. The bytes should not
+        be modified after.
+        """
+        self = cls().load(encoding.loads(content), validate=validate)
+        if validate and isinstance(content, (bytes, bytearray, memoryview)):
+            self._raw = (self._validated, memoryview(content).cast("B"), {})
+        return self
+
+    @property
+    def raw(self):
+        """
+        The original json (a memoryview) the structure was loaded from.
+
+        This is None if the structure was not loaded from bytes, or if it
+        (or a nested structure) was changed after.
+        """
+        raw = self._raw
+        if raw is None or raw[0] != self._validated or not self._is_validated():
+            return None
+        return raw[1]
+
+    def raw_digest(self, algorithm=None):
+        """
+        Return the Digest of the original json, computed once.
+
+        The algorithm defaults to Canonical, and None is returned if there
+        are no raw bytes (see raw).
+        """
+        from opencontainers.digest import Canonical
+
+        raw = self.raw
+        if raw is None:
+            return None
+        algorithm = algorithm or Canonical
+        digests = self._raw[2]
+        digest = digests.get(algorithm)
+        if digest is None:
+            digest = digests[algorithm] = algorithm.fromBytes(raw)
+        return digest
+
     def add(self, name, value):
         """
         Add a value to an existing attribute, normally when used by a client
         """
         if value is None:
             return
-        if name not in self.attrs:
+        attr = self._schema.attrs.get(name)
+        if attr is None:
             bot.exit("%s is not a valid attribute." % name)
-        attr = self.attrs[name]
+        current = self._values[attr.index]
 
         valueType = type(value)
         if attr._is_struct():
@@ -316,27 +973,27 @@ class Struct:
             if not is_struct(valueType):
                 value = attr.attType().load(value)
             if attr.attType in [StrStruct, IntStruct]:
-                if attr.value is not None:
-                    value = attr.value + value
-        elif attr.attType == list or isinstance(attr.attType, list):
+                if current is not None:
+                    value = current + value
+        elif attr.attType == list or attr.is_list:
             # Target is a list of Struct
-            if is_struct(attr.attType[0]):
+            if attr.child is not None:
                 # Load values from dict or list of dicts
                 # list may also already contain Structs
                 if valueType == dict:
-                    value = attr.attType[0]().load(value)
+                    value = attr.child().load(value)
                 elif valueType == list:
                     for k, v in enumerate(value):
-                        if not is_struct(value):
-                            value[k] = attr.attType[0]().load(v)
+                        if not is_struct(type(v)):
+                            value[k] = attr.child().load(v)
 
             if valueType == list:
-                value = (attr.value or []) + value
+                value = (current or []) + value
             else:
-                value = (attr.value or []) + [value]
+                value = (current or []) + [value]
         elif attr.attType == dict:
             if valueType == dict:
-                value.update(attr.value or {})
+                value.update(current or {})
             else:
                 raise ValueError(
                     "dict expected for {}, got {}: {}".format(name, valueType, value)
@@ -345,7 +1002,7 @@ class Struct:
             pass
 
         # Don't validate the type if provided is empty
-        if value and not attr.set(value):
+        if value and not self._set(attr, value):
             bot.exit("%s must be type %s." % (name, attr.attType))
 
     def load(self, content, validate=True):
@@ -355,26 +1012,27 @@ class Struct:
         given a dictionary load into its respective object
         if validate is True, we require it to be completely valid.
         """
-        if Struct in type(content).__bases__:
+        if isinstance(content, Struct):
             self = content
         else:
             if not isinstance(content, dict):
                 bot.exit("Please provide a dictionary to load.")
 
             # Look up attributes based on jsonKey
-            lookup = self.generate_json_lookup()
+            lookup = self._schema.json
 
-            for key, value in content.items():
-                att = lookup.get(key)
-                if not att:
+            for key in content:
+                if key not in lookup:
                     bot.exit("%s is not a valid json attribute." % key)
 
             # If we get here, all parameters are valid, replace
             self._clear_values()
+            if self._raw is not None:
+                self._raw = None
 
             for key, value in content.items():
-                att = lookup.get(key)
-                valid = att.set(value)
+                att = lookup[key]
+                valid = self._set(att, value)
                 if not valid and validate:
                     bot.exit("%s (%s) is not valid." % (att.name, att.jsonName))
 
@@ -391,10 +1049,7 @@ class Struct:
         based on the attributes, generate a jsonName lookup object.
         keys are jsonNames we find in the wild, names are attribute names.
         """
-        lookup = dict()
-        for name, att in self.attrs.items():
-            lookup[att.jsonName] = att
-        return lookup
+        return AttrsView(self, self._schema.json)
 
     def validate(self):
         """
@@ -404,35 +1059,112 @@ class Struct:
         correct type, and if required it is defined. This is already done
         to some extent when load is called, but this function serves as
         a final validation (after an initial config is loaded).
+
+        Nested structures are validated too, in the same pass. A structure
+        that is unchanged since it was last validated is not validated
+        again. Changes made with add, load or attrs are tracked, but changing
+        a value in place (e.g., appending to a list returned by get) is not,
+        so use add instead.
         """
-        for name, att in self.attrs.items():
+        if self._is_validated():
+            return True
+
+        for name, att in self._schema.attrs.items():
+            value = self._values[att.index]
 
             # Not required, undefined
-            if not att.required and not att.value:
+            if not att.required and not value:
                 continue
 
             # A required attribute cannot be None or empty
-            if att.required and not att.value:
+            if att.required and not value:
                 bot.error("%s is required." % name)
                 return False
 
             # The attribute must match its type
-            if not att.validate_type(att.value):
+            if not att.validate_type(value):
                 bot.error("%s should be type %s" % (name, att.attType))
                 return False
 
+            # Nested structures are only validated if changed
+            if att.mutable:
+                for child in value if att.is_list else [value]:
+                    if not child.validate():
+                        bot.error("%s is invalid" % name)
+                        return False
+
         # Some structs need to further validate string content
         if hasattr(self, "_validate"):
             if not self._validate():
                 return False
+        self._validated = next(validation_stamps)
         return True
 
     def get(self, name, default=None):
-        r = self.attrs[name].value
+        r = self._values[self._schema.attrs[name].index]
         if r is None:
             r = default
         return r
 
+    def clone(self):
+        """
+        Return a copy of the structure that shares nested structures.
+
+        Only the values of this structure are copied (lists and dictionaries
+        too, so changing one in place doesn't change the other), so a clone
+        costs the same for a manifest with a config and ten layers as for
+        one with a thousand. A valid structure stays valid, and the clone is
+        not frozen (see __hash__). As nested structures are shared, use
+        evolve (which clones the structure) to change them.
+        """
+        cls = type(self)
+        clone = cls.__new__(cls)
+        state = dict(self.__dict__)
+        state.pop("_hash", None)
+        if "_schema" in state:
+            state["_schema"] = state["_schema"].copy()
+        state["_values"] = [_copied(value) for value in self._values]
+        clone.__dict__.update(state)
+        return clone
+
+    def evolve(self, **changes):
+        """
+        Return a clone of the structure with some attributes changed.
+
+        Attributes are named as for get and add, values replace (and are
+        converted and checked as with add) and None unsets. To change a
+        nested structure, evolve it too, e.g., for a manifest:
+
+            manifest.evolve(Config=manifest.get("Config").evolve(Size=10))
+
+        Only the changed structures are new, and only they (and the ones
+        they are in) are validated again.
+        """
+        clone = self.clone()
+        attrs = clone._schema.attrs
+        for name, value in changes.items():
+            attr = attrs.get(name)
+            if attr is None:
+                bot.exit("%s is not a valid attribute." % name)
+            if value is None:
+                clone._changed()
+                clone._values[attr.index] = None
+            elif not clone._set(attr, value):
+                bot.exit("%s must be type %s." % (name, attr.attType))
+        return clone
+
+    def get_datetime(self, name, default=None):
+        """
+        Get a timestamp attribute (e.g., Created) as a datetime.
+
+        Timestamps are stored (and serialized) as strings, and parsed with
+        parse_datetime, which caches the result of validation.
+        """
+        value = self.get(name)
+        if value is None:
+            return default
+        return parse_datetime(value)
+
 
 class StrStruct(Struct, str):
     """
@@ -442,10 +1174,25 @@ class StrStruct(Struct, str):
     tied to attributes but rather a single string value.
     """
 
+    # Equality and hashing are those of the string
+    __eq__ = str.__eq__
+    __ne__ = str.__ne__
+    __hash__ = str.__hash__
+
+    def __reduce__(self):
+        return (type(self), (str(self),))
+
+    def clone(self):
+        return self
+
     def __init__(self, value=None, **kwargs):
         self.value = value or ""
         super().__init__(**kwargs)
 
+    @classmethod
+    def from_trusted_dict(cls, content, lazy=False):
+        return cls(content)
+
     def load(self, content, validate=True):
         # If we have a string, self must also have string subclass
         if isinstance(self, str) and isinstance(content, str):
@@ -462,13 +1209,81 @@ class IntStruct(Struct, int):
     tied to attributes but rather a single int value.
     """
 
+    # Equality and hashing are those of the integer
+    __eq__ = int.__eq__
+    __ne__ = int.__ne__
+    __hash__ = int.__hash__
+
+    def __reduce__(self):
+        return (type(self), (int(self),))
+
+    def clone(self):
+        return self
+
     def __init__(self, value=None, **kwargs):
         self.value = value or 0
         super().__init__(**kwargs)
 
+    @classmethod
+    def from_trusted_dict(cls, content, lazy=False):
+        return cls(content)
+
     def load(self, content, validate=True):
         # If we have an int, self must also have int subclass
         if isinstance(self, int) and isinstance(content, int):
             self = self.__class__(content)
             self.validate()
             return self
+
+
+class InternPool:
+    """
+    A pool of structures, so that equal structures share one object.
+
+    A mirror with thousands of manifests that share config and layer
+    descriptors can keep a single copy of each with a pool:
+
+        pool = InternPool(Descriptor, Digest)
+        manifest = pool.intern(Manifest.from_trusted_dict(content))
+
+    intern replaces nested structures of the given types (all structures
+    if no types are given) with the equal one already in the pool, and
+    returns the pooled structure. Interned structures are hashed, and so
+    frozen (see Struct.__hash__). The pool holds a reference to every
+    structure in it, use clear (or a new pool) to release them.
+    """
+
+    def __init__(self, *types):
+        self.types = types
+        self.pool = {}
+
+    def __len__(self):
+        return len(self.pool)
+
+    def __contains__(self, value):
+        return (type(value), value) in self.pool
+
+    def clear(self):
+        self.pool.clear()
+
+    def intern(self, value):
+        """
+        Intern a structure (and the structures nested in it).
+        """
+        if not isinstance(value, Struct):
+            return value
+
+        # Nested structures first, so the pool holds the shared ones
+        values = value._values
+        for attr in value._schema.attrs.values():
+            if attr.child is None or values[attr.index] is None:
+                continue
+            current = values[attr.index]
+            if isinstance(current, list):
+                values[attr.index] = [self.intern(item) for item in current]
+            else:
+                values[attr.index] = self.intern(current)
+
+        if self.types and not isinstance(value, self.types):
+            return value
+        return self.pool.setdefault((type(value), value), value)
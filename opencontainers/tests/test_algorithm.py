@@ -6,8 +6,14 @@
 # Mozilla Public License, v. 2.0. If a copy of the MPL was not distributed
 # with this file, You can obtain one at http://mozilla.org/MPL/2.0/.
 
-from opencontainers.digest import Digest, FromBytes
-from opencontainers.digest.algorithm import Algorithm, algorithms
+from opencontainers.digest import Digest, FromBytes, multiDigester
+from opencontainers.digest.algorithm import (
+    Algorithm,
+    RegisterAlgorithm,
+    algorithms,
+    anchoredEncodedRegexps,
+    registry,
+)
 
 from opencontainers.digest.exceptions import (
     ErrDigestInvalidLength,
@@ -37,3 +43,89 @@ def test_algorithms(tmp_path):
         readerDgst = alg.fromReader(newReader)
 
         assert alg.fromBytes(p) == readerDgst == alg.fromString(asciitext)
+
+
+def test_register_algorithm(tmp_path):
+    """test registering an algorithm, and the metadata of the registry"""
+    info = registry["sha256"]
+    assert info.size == Algorithm("sha256").size() == 32
+    assert info.encodedSize == 64
+    assert anchoredEncodedRegexps["sha256"] is info.regexp
+
+    # A full digest can be provided too
+    assert Algorithm("sha512:abc").available()
+    assert not Algorithm("md5").available()
+    with pytest.raises(ErrDigestUnsupported):
+        Digest("md5:d41d8cd98f00b204e9800998ecf8427e").validate()
+
+    try:
+        assert RegisterAlgorithm("md5")
+        assert not RegisterAlgorithm("md5")
+        assert Algorithm("md5").size() == 16
+        assert "md5" in algorithms and "md5" in anchoredEncodedRegexps
+        digest = Algorithm("md5").fromBytes(b"")
+        assert digest == "md5:d41d8cd98f00b204e9800998ecf8427e"
+        assert digest.validate()
+        with pytest.raises(ErrDigestInvalidLength):
+            Digest("md5:abcdef0123456789").validate()
+
+        verifier = digest.verifier()
+        assert verifier.verified()
+    finally:
+        for lookup in registry, algorithms, anchoredEncodedRegexps:
+            lookup.pop("md5", None)
+
+    # A separator would start the extra component of a digest, and other
+    # names must be known to hashlib
+    for name in ["sha3_256", "sha3-256", "sha3.256", "SHA1", "", "nosuchalgo"]:
+        with pytest.raises(SystemExit):
+            RegisterAlgorithm(name)
+        assert name not in registry
+
+
+def test_from_file_and_stream(tmp_path):
+    """test digesting a file by path (memory mapped) and as a stream"""
+    content = bytes(range(256)) * 4099
+    path = tmp_path / "blob"
+    path.write_bytes(content)
+    empty = tmp_path / "empty"
+    empty.write_bytes(b"")
+
+    for name, alg in algorithms.items():
+        expected = alg.fromBytes(content)
+        assert alg.fromFile(str(path)) == expected
+        assert alg.fromFile(empty) == alg.fromBytes(b"")
+        with open(path, "rb") as fd:
+            assert alg.fromStream(fd, chunk_size=1000) == expected
+
+        # Without readinto, e.g., a response
+        stream = io.BytesIO(content)
+        stream.readinto = None
+        assert alg.fromStream(stream, chunk_size=4096) == expected
+
+    with pytest.raises(SystemExit):
+        Algorithm("shalalala").fromFile(str(path))
+
+
+def test_multi_digester(tmp_path):
+    """test digesting content under several algorithms in one pass"""
+    content = bytes(range(256)) * 4099
+    path = tmp_path / "blob"
+    path.write_bytes(content)
+
+    with open(path, "rb") as fd:
+        digests = multiDigester().readFrom(fd, chunk_size=1000).digests()
+    assert digests == {
+        "sha256": algorithms["sha256"].fromBytes(content),
+        "sha512": algorithms["sha512"].fromBytes(content),
+    }
+
+    multi = multiDigester(["sha384", algorithms["sha256"]])
+    multi.write(memoryview(content)[:100])
+    multi.write(bytearray(content[100:]))
+    for alg, digest in multi.digests().items():
+        assert isinstance(alg, Algorithm)
+        assert digest == alg.fromFile(path)
+
+    with pytest.raises(SystemExit):
+        multiDigester(["shalalala"])
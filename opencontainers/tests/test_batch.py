@@ -0,0 +1,86 @@
+#!/usr/bin/python
+
+# Copyright (C) 2019-2022 Vanessa Sochat.
+
+# This Source Code Form is subject to the terms of the
+# Mozilla Public License, v. 2.0. If a copy of the MPL was not distributed
+# with this file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+from opencontainers.image.v1 import Manifest
+from opencontainers.batch import load_many
+import json
+import pytest
+
+
+def manifest(size):
+    return {
+        "schemaVersion": 2,
+        "config": {
+            "mediaType": "application/vnd.oci.image.config.v1+json",
+            "size": size,
+            "digest": "sha256:b5b2b2c507a0944348e0303114d8d93aaaa081732b86451d9bce1f432a537bc7",
+        },
+        "layers": [
+            {
+                "mediaType": "application/vnd.oci.image.layer.v1.tar+gzip",
+                "size": 32654,
+                "digest": "sha256:9834876dcfb05cb167a5c24953eba58c4ac89b1adf57f28f2f9d09af107ee8f0",
+            }
+        ],
+    }
+
+
+def test_load_many(tmp_path):
+    print("Testing loading manifests across a process pool")
+    contents = [manifest(size) for size in range(1, 20)]
+
+    # Dictionaries and json (bytes) can be mixed
+    contents[3] = json.dumps(contents[3]).encode("utf-8")
+    manifests = load_many(Manifest, contents, workers=2, chunksize=4)
+    assert len(manifests) == 19
+    for size, loaded in enumerate(manifests, start=1):
+        assert isinstance(loaded, Manifest)
+        assert loaded.get("Config").get("Size") == size
+        assert loaded._is_validated()
+
+    # Invalid content exits, as with load
+    contents[5]["config"]["mediaType"] = "application/vnd.oci.image.layer.v1.tar"
+    with pytest.raises(SystemExit):
+        load_many(Manifest, contents, workers=2)
+
+
+@pytest.mark.parametrize("workers", [None, 2])
+def test_validate_many(tmp_path, workers):
+    print("Testing validating manifests without exiting")
+    from opencontainers.batch import validate_many
+
+    contents = [manifest(size) for size in range(1, 6)]
+    contents[1]["config"]["mediaType"] = "application/vnd.oci.image.layer.v1.tar"
+    contents[2]["config"]["digest"] = "sha256:tooshort"
+    contents[3] = b'{"schemaVersion": 2'
+
+    reports = list(validate_many(Manifest, contents, workers=workers))
+    assert [report.index for report in reports] == list(range(5))
+    assert [report.valid for report in reports] == [True, False, False, False, True]
+    assert isinstance(reports[0].struct, Manifest) and not reports[0].errors
+    assert "config mediaType" in reports[1].errors[0]
+    assert reports[2].errors and reports[3].errors
+    assert reports[1].struct is None
+
+    # Contents are read as reports are consumed, and structures can be dropped
+    read = []
+
+    def generate():
+        for size in range(1, 101):
+            read.append(size)
+            yield manifest(size)
+
+    reports = validate_many(
+        Manifest, generate(), workers=workers, chunksize=2, keep_structs=False
+    )
+    report = next(reports)
+    assert report.valid and report.struct is None and not report.errors
+    assert len(read) < 100
+    reports = list(reports)
+    assert len(read) == 100 and len(reports) == 99
+    assert all(report.valid and report.struct is None for report in reports)
@@ -0,0 +1,103 @@
+#!/usr/bin/python
+
+# Copyright (C) 2019-2022 Vanessa Sochat.
+
+# This Source Code Form is subject to the terms of the
+# Mozilla Public License, v. 2.0. If a copy of the MPL was not distributed
+# with this file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+from opencontainers.image.v1 import (
+    Descriptor,
+    Platform,
+    Manifest,
+    Index,
+    ImageConfig,
+    RootFS,
+    History,
+    Image,
+)
+from opencontainers.tests import (
+    test_config,
+    test_descriptor,
+    test_imageindex,
+    test_manifest,
+)
+from opencontainers.logger import bot
+from opencontainers import codegen
+import pytest
+import re
+
+classes = [Descriptor, Platform, Manifest, Index, ImageConfig, RootFS, History, Image]
+
+
+def fixtures(module):
+    """
+    Return the (valid and invalid) content dictionaries of a test module.
+    """
+    return [
+        value
+        for name, value in sorted(vars(module).items())
+        if isinstance(value, dict) and not name.startswith("_")
+    ]
+
+
+def outcome(cls, content):
+    """
+    Load content, and return the result (or error) with any messages.
+    """
+    with bot.capture() as errors:
+        try:
+            struct = cls().load(content)
+            result = (struct.to_dict(), struct.validate())
+        except SystemExit:
+            result = "exit"
+        except Exception as e:
+            result = type(e)
+
+    # Messages name structures by address, which differs between loads
+    return result, [re.sub(" at 0x[0-9a-f]+", "", error) for error in errors]
+
+
+@pytest.mark.parametrize(
+    "cls,module",
+    [
+        (Image, test_config),
+        (Descriptor, test_descriptor),
+        (Index, test_imageindex),
+        (Manifest, test_manifest),
+    ],
+)
+def test_codegen(tmp_path, cls, module):
+    print("Testing generated functions against the generic ones")
+    contents = fixtures(module)
+    assert contents
+
+    # Generic load, validate and to_dict
+    codegen.uninstall(*classes)
+    try:
+        expected = [outcome(cls, content) for content in contents]
+    finally:
+        codegen.install(*classes)
+
+    assert cls.load is codegen.generate(cls).load
+    for content, result in zip(contents, expected):
+        assert outcome(cls, content) == result
+
+
+def test_codegen_fallback(tmp_path):
+    print("Testing generated functions for instances that differ from the class")
+
+    class Labeled(Descriptor):
+        pass
+
+    # A subclass, or an instance with its own attributes, is generic
+    content = test_descriptor.valid_descriptor
+    assert Labeled().load(content).to_dict() == content
+    descriptor = Descriptor()
+    descriptor.newAttr(name="Label", attType=str, jsonName="label")
+    assert "_schema" in descriptor.__dict__
+    labeled = descriptor.load(dict(content, label="one"))
+    assert labeled.to_dict()["label"] == "one"
+
+    # Generated source can be looked at
+    assert "def fill(self, content):" in codegen.generate(Descriptor).source
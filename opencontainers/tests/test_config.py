@@ -176,3 +176,38 @@ def test_example_config(tmp_path):
     # minimum valid required
     image.load(config_valid_required)
     assert image.validate()
+
+
+def test_config_created(tmp_path):
+    print("Testing RFC 3339 timestamps for created")
+    from opencontainers.struct import parse_datetime
+    from datetime import datetime, timedelta, timezone
+
+    image = Image().load(config_valid_with_optional)
+    created = image.get_datetime("Created")
+    assert created == datetime(2015, 10, 31, 22, 22, 56, 15925, tzinfo=timezone.utc)
+    assert image.get("History")[0].get_datetime("Created").microsecond == 690851
+    assert Image().load(config_valid_required).get_datetime("Created") is None
+    assert image.to_dict()["created"] == config_valid_with_optional["created"]
+
+    # Parsed timestamps are cached
+    assert parse_datetime(config_valid_with_optional["created"]) is created
+
+    offset = parse_datetime("2015-10-31T22:22:56.5-08:30")
+    assert offset.utcoffset() == -timedelta(hours=8, minutes=30)
+    assert parse_datetime("1990-12-31T23:59:60z").second == 59
+
+    for invalid in [
+        "2015-10-31",
+        "2015-10-31T22:22:56",
+        "2015-10-31 22:22:56Z",
+        "2015-02-30T22:22:56Z",
+        "2015-10-31T22:22:56.Z",
+        "2015-10-31T22:22:56+24:00",
+        "2015-10-31T22:22:61Z",
+        "2015-10-31T22:22:99Z",
+    ]:
+        with pytest.raises(ValueError):
+            parse_datetime(invalid)
+        with pytest.raises(SystemExit):
+            Image().load(dict(config_valid_required, created=invalid))
@@ -245,3 +245,54 @@ def test_descriptor(tmp_path):
     # test for those who cannot use modulo arithmetic to recover padding.
     with pytest.raises(ErrDigestInvalidLength):
         desc.load(digest_unknown)
+
+
+def test_descriptor_hash():
+    print("Testing descriptor equality, hashing and interning")
+    from opencontainers.image.v1 import Manifest
+    from opencontainers.digest import Digest
+    from opencontainers.struct import InternPool
+
+    first = Descriptor().load(valid_descriptor)
+    second = Descriptor.from_trusted_dict(valid_descriptor)
+    assert first == second
+    assert first != Descriptor().load(expected_success)
+    assert len({first, second}) == 1
+
+    # Digests keep the equality and hash of a string
+    digest = first.get("Digest")
+    assert digest == valid_descriptor["digest"]
+    assert hash(digest) == hash(valid_descriptor["digest"])
+
+    # A hashed descriptor is frozen
+    with pytest.raises(SystemExit):
+        first.add("Size", 10)
+    with pytest.raises(SystemExit):
+        first.load(expected_success)
+
+    # Manifests sharing a config and layers share the descriptors
+    config = dict(
+        valid_descriptor, mediaType="application/vnd.oci.image.config.v1+json"
+    )
+    layer = dict(valid_descriptor, mediaType="application/vnd.oci.image.layer.v1.tar")
+    manifest = {"schemaVersion": 2, "config": config, "layers": [layer, dict(layer)]}
+    pool = InternPool(Descriptor, Digest)
+    one = pool.intern(Manifest.from_trusted_dict(manifest))
+    two = pool.intern(Manifest().load(manifest))
+    assert one is not two
+    assert one == two
+    assert one.get("Config") is two.get("Config")
+    assert one.get("Layers")[0] is one.get("Layers")[1] is two.get("Layers")[1]
+    assert one.get("Config").get("Digest") is two.get("Layers")[0].get("Digest")
+
+    # One config and one layer descriptor, with one digest
+    assert len(pool) == 3
+    assert one.validate() and two.validate()
+
+    # Structures without attrs (e.g., digesters) are compared by identity
+    from opencontainers.digest.algorithm import SHA256, SHA512
+
+    digesters = [SHA256.digester(), SHA512.digester(), SHA256.digester()]
+    assert digesters[0] == digesters[0]
+    assert digesters[0] != digesters[1] and digesters[0] != digesters[2]
+    assert len(set(digesters)) == 3
@@ -6,12 +6,26 @@
 # Mozilla Public License, v. 2.0. If a copy of the MPL was not distributed
 # with this file, You can obtain one at http://mozilla.org/MPL/2.0/.
 
-from opencontainers.digest import Parse, NewDigestFromEncoded
+from opencontainers.digest import (
+    Digest,
+    DigestSet,
+    FromBytes,
+    Parse,
+    ParseDigest,
+    ParsedDigest,
+    NewDigestFromEncoded,
+    DigestRegexpAnchored,
+    digest_many,
+    resumableDigester,
+)
+from opencontainers.digest import resumable
 
 from opencontainers.digest.exceptions import (
     ErrDigestInvalidLength,
     ErrDigestInvalidFormat,
     ErrDigestUnsupported,
+    ErrDigestNotFound,
+    ErrDigestAmbiguous,
 )
 import os
 import pytest
@@ -120,3 +134,185 @@ def test_digests(tmp_path):
                     digest["algorithm"], digest["encoded"]
                 )
                 assert newFromEncoded == d
+
+
+def test_digest_regexp(tmp_path):
+    """test the anchored digest regular expression"""
+    for digest in digests:
+        if "err" not in digest:
+            assert DigestRegexpAnchored.search(digest["input"])
+    assert not DigestRegexpAnchored.search("prefix " + digests[0]["input"])
+    assert not DigestRegexpAnchored.search("d41d8cd98f00b204e9800998ecf8427e")
+
+
+def test_parse_digest_cache(tmp_path):
+    """test that parsed digests are cached, and invalid digests still raise"""
+    ParseDigest.cache_clear()
+    digest = digests[0]
+    parsed = ParseDigest(digest["input"])
+    assert isinstance(parsed, ParsedDigest)
+    assert parsed.algorithm == digest["algorithm"]
+    assert parsed.encoded == digest["encoded"]
+    assert parsed.raw == bytes.fromhex(digest["encoded"])
+    with pytest.raises(AttributeError):
+        parsed.encoded = "changed"
+
+    # The same digest is returned, and accessors use the cache
+    d = Parse(digest["input"])
+    assert d is parsed.digest
+    assert Parse(digest["input"]) is d
+    assert Digest(digest["input"]).parsed() is parsed
+    assert Digest(digest["input"]).algorithm is parsed.algorithm
+    assert ParseDigest.cache_info().misses == 1
+
+    # Loading a structure shares the cached digest
+    from opencontainers.image.v1 import Descriptor
+
+    descriptor = {"mediaType": "application/vnd.oci.image.layer.v1.tar"}
+    descriptor.update(size=10, digest=digest["input"])
+    assert Descriptor().load(descriptor).get("Digest") is d
+    assert Digest().load(digest["input"]) is d
+
+    # The extra component is removed from the algorithm
+    parsed = ParseDigest(digests[-2]["input"])
+    assert parsed.algorithm == "sha384"
+
+    # Errors aren't cached, and accessors still work for unsupported digests
+    for _ in range(2):
+        with pytest.raises(ErrDigestUnsupported):
+            Digest("foo:d41d8cd98f00b204e9800998ecf8427e").validate()
+    d = Digest("foo:d41d8cd98f00b204e9800998ecf8427e")
+    assert d.algorithm == "foo"
+    assert d.encoded() == "d41d8cd98f00b204e9800998ecf8427e"
+
+
+def test_digest_many(tmp_path):
+    """test digesting many files in a thread pool"""
+    expected = {}
+    for i in range(20):
+        content = bytes(str(i), "utf-8") * (i * 1000)
+        path = str(tmp_path / ("blob-%s" % i))
+        with open(path, "wb") as fd:
+            fd.write(content)
+        expected[path] = (FromBytes(content), len(content))
+
+    results = list(digest_many(expected, workers=4))
+    assert len(results) == len(expected)
+    for path, digest, size in results:
+        assert (digest, size) == expected[path]
+
+    results = digest_many(expected, algorithm="sha512", workers=2)
+    for path, digest, size in results:
+        assert digest.algorithm == "sha512"
+        assert digest.validate()
+
+    with pytest.raises(FileNotFoundError):
+        list(digest_many([str(tmp_path / "missing")]))
+    with pytest.raises(SystemExit):
+        list(digest_many(expected, algorithm="shalalala"))
+
+
+def test_resumable_digester(tmp_path, monkeypatch):
+    """test checkpointing a digest and resuming it, with both sha256"""
+    content = bytes(range(256)) * 41 + b"end"
+    checkpoint = str(tmp_path / "blob.checkpoint")
+    libcrypto = resumable._libcrypto()
+
+    for lib in libcrypto, None:
+        monkeypatch.setattr(resumable, "libcrypto", lib)
+        for split in 0, 1000, 1024, len(content):
+            digester = resumableDigester()
+            digester.write(content[:split])
+            digester.checkpoint(checkpoint)
+            assert digester.offset == split
+
+            # The transfer is interrupted, and resumed from offset
+            digester = resumableDigester.restore(checkpoint)
+            assert digester.offset == split
+            digester.write(memoryview(content)[digester.offset :])
+            assert digester.digest() == FromBytes(content)
+
+    # The state is the same for both, so checkpoints can be shared
+    if libcrypto is not None:
+        monkeypatch.setattr(resumable, "libcrypto", libcrypto)
+        hashObj = resumable.cSha256()
+        hashObj.update(content[:1000])
+        assert resumable.pySha256(hashObj.state()).state() == hashObj.state()
+
+    with open(checkpoint, "w") as fd:
+        fd.write('{"algorithm": "sha512", "offset": 0}')
+    with pytest.raises(SystemExit):
+        resumableDigester.restore(checkpoint)
+
+    # libcrypto is loaded on first use, with a warning if it can't be
+    warnings = []
+    monkeypatch.setattr(resumable, "libcrypto", False)
+    monkeypatch.setattr(resumable, "_load_libcrypto", lambda: None)
+    monkeypatch.setattr(resumable.bot, "warning", warnings.append)
+    assert isinstance(resumableDigester().hash, resumable.pySha256)
+    assert isinstance(resumableDigester().hash, resumable.pySha256)
+    assert len(warnings) == 1 and "pure Python" in warnings[0]
+    with pytest.raises(SystemExit):
+        resumable.cSha256()
+
+
+def test_resumable_lazy(tmp_path):
+    """test that importing the package doesn't load libcrypto"""
+    import subprocess
+    import sys
+
+    script = (
+        "import opencontainers.image.v1\n"
+        "from opencontainers.digest import resumable\n"
+        "assert resumable.libcrypto is False\n"
+    )
+    subprocess.run([sys.executable, "-c", script], check=True)
+
+
+def test_digest_set(tmp_path):
+    """test adding, removing and looking up (short) digests in a DigestSet"""
+    digests = [FromBytes(bytes(str(i), "utf-8")) for i in range(2000)]
+    dset = DigestSet(digests)
+    assert len(dset) == 2000
+    assert not dset.add(digests[0])
+    assert sorted(dset.all()) == sorted(digests)
+
+    digest = digests[7]
+    assert digest in dset
+    assert dset.lookup(str(digest)) == digest
+    assert dset.lookup(digest.encoded()[:12]) == digest
+    for d, short in dset.shortCodeTable().items():
+        assert len(short) == 12
+        assert dset.lookup(short) == d
+    for d, short in dset.shortCodeTable(length=1).items():
+        assert dset.lookup(short) == d
+
+    with pytest.raises(ErrDigestAmbiguous):
+        dset.lookup("a")
+    with pytest.raises(ErrDigestNotFound):
+        dset.lookup("sha256:" + "0" * 64)
+    assert dset.lookup("sha256:" + digest.encoded()[:12]) == digest
+    for string in ["", "sha256:", "sha512:" + digest.encoded()[:12]]:
+        with pytest.raises(ErrDigestNotFound):
+            dset.lookup(string)
+    with pytest.raises(ErrDigestAmbiguous):
+        dset.lookup("sha256:a")
+
+    # The same encoded portion with another algorithm is ambiguous as a prefix
+    other = "sha256+b64:" + digest.encoded()
+    assert dset.add(other)
+    with pytest.raises(ErrDigestAmbiguous):
+        dset.lookup(digest.encoded())
+    assert dset.lookup("sha256+b64:" + digest.encoded()[:12]) == other
+    assert dset.lookup("sha256:" + digest.encoded()[:12]) == digest
+    assert dset.shortCodeTable()[digest] == digest
+    dset.remove(other)
+
+    dset.remove(digest)
+    assert digest not in dset
+    assert len(dset) == 1999
+    with pytest.raises(ErrDigestNotFound):
+        dset.lookup(digest.encoded()[:12])
+    with pytest.raises(ErrDigestNotFound):
+        dset.remove(digest)
+    assert "not a digest" not in dset
@@ -0,0 +1,80 @@
+#!/usr/bin/python
+
+# Copyright (C) 2019-2022 Vanessa Sochat.
+
+# This Source Code Form is subject to the terms of the
+# Mozilla Public License, v. 2.0. If a copy of the MPL was not distributed
+# with this file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+from opencontainers import encoding
+from opencontainers.image.v1 import Manifest
+import json
+import pytest
+
+valid_manifest = {
+    "schemaVersion": 2,
+    "config": {
+        "mediaType": "application/vnd.oci.image.config.v1+json",
+        "size": 1470,
+        "digest": "sha256:c86f7763873b6c0aae22d963bab59b4f5debbed6685761b5951584f6efb0633b",
+    },
+    "layers": [
+        {
+            "mediaType": "application/vnd.oci.image.layer.v1.tar+gzip",
+            "size": 675598,
+            "digest": "sha256:9d3dd9504c685a304985025df4ed0283e47ac9ffa9bd0326fddf4d59513f0827",
+        }
+    ],
+    "annotations": {"com.example.key": "välue/with/slashes"},
+}
+
+
+def installed():
+    """Return the names of json backends that are installed"""
+    names = []
+    for name in encoding.preferred:
+        try:
+            encoding.get_backend(name)
+            names.append(name)
+        except ImportError:
+            pass
+    return names
+
+
+@pytest.fixture(params=installed())
+def backend(request):
+    yield encoding.set_backend(request.param)
+    encoding.set_backend()
+
+
+def test_encoding(backend):
+    """test each json backend writes the same compact json"""
+    expected = json.dumps(valid_manifest, separators=(",", ":"), ensure_ascii=False)
+    assert encoding.dumps(valid_manifest) == expected
+    assert encoding.dumpb(valid_manifest) == expected.encode("utf-8")
+
+    content = encoding.dumpb(valid_manifest)
+    for loadable in [content, content.decode("utf-8"), memoryview(content)]:
+        assert encoding.loads(loadable) == valid_manifest
+
+    # Pretty printing doesn't depend on the backend
+    assert encoding.dumps(valid_manifest, indent=4) == json.dumps(
+        valid_manifest, indent=4
+    )
+
+
+def test_struct_json(backend):
+    """test a Struct to and from json"""
+    manifest = Manifest.from_json(json.dumps(valid_manifest).encode("utf-8"))
+    assert manifest.to_dict() == valid_manifest
+    assert json.loads(manifest.to_json()) == valid_manifest
+    assert manifest.to_json(indent=None) == encoding.dumps(manifest.to_dict())
+    assert "\n" not in manifest.to_json(indent=None)
+
+    # Invalid content is still an error
+    with pytest.raises(SystemExit):
+        Manifest.from_json(b'{"schemaVersion": 2}')
+
+    # All backends raise a ValueError (or subclass) for invalid json
+    with pytest.raises(ValueError):
+        Manifest.from_json(b"{not json")
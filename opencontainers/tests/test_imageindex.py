@@ -162,3 +162,70 @@ def test_imageindex(tmp_path):
 
     # valid image index, with customized media type of referenced manifest
     index.load(index_with_custom)
+
+
+def test_imageindex_lazy():
+    print("Testing lazy creation of index manifests")
+    from opencontainers.image.v1 import Descriptor
+
+    index = Index.from_trusted_dict(index_with_optional, lazy=True)
+    manifests = index.get("Manifests")
+    assert len(manifests) == 2
+    assert manifests.created() == 0
+
+    # Content of an entry doesn't create it
+    assert manifests.content(1)["platform"]["architecture"] == "amd64"
+    assert manifests.created() == 0
+
+    # Only the entry accessed is created (and its platform with it)
+    manifest = manifests[1]
+    assert isinstance(manifest, Descriptor)
+    assert manifest.get("Platform").get("Architecture") == "amd64"
+    assert manifests.created() == 1
+    assert manifests[1] is manifest
+
+    # Validation (and to_dict) needs every entry
+    assert index.validate()
+    assert manifests.created() == 2
+    assert index.to_dict() == Index.from_trusted_dict(index_with_optional).to_dict()
+    assert index.to_dict() == index_with_optional
+
+
+def test_imageindex_nested_change():
+    print("Testing a change to the platform of an index entry")
+    import copy
+
+    index = Index().load(copy.deepcopy(index_with_optional))
+    assert index.validate()
+
+    # A required field of a platform (two levels down) is unset
+    index.get("Manifests")[0].get("Platform").attrs["OS"].value = None
+    assert not index.validate()
+
+
+def test_imageindex_nested_digest():
+    print("Testing the digest of an index after an entry's platform changes")
+    import copy
+
+    index = Index().load(copy.deepcopy(index_with_optional))
+    digest = index.digest()
+
+    index.get("Manifests")[0].get("Platform").add("Architecture", "arm64")
+    assert index.to_dict()["manifests"][0]["platform"]["architecture"] == "arm64"
+    assert index.digest() != digest
+    assert index.digest() == Index().load(index.to_dict()).digest()
+
+
+def test_imageindex_nested_raw():
+    print("Testing the raw bytes of an index after an entry's platform changes")
+    import json
+
+    content = json.dumps(index_with_optional, indent=2).encode("utf-8")
+    index = Index.from_json(content)
+    assert index.raw == content
+
+    # A change two levels down, the original bytes no longer describe it
+    index.get("Manifests")[1].get("Platform").add("OS", "windows")
+    assert index.raw is None and index.raw_digest() is None
+    assert index.digest() == Index().load(index.to_dict()).digest()
+    assert index.descriptor().get("Size") == len(index.to_canonical_json())
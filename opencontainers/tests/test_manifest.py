@@ -6,8 +6,11 @@
 # Mozilla Public License, v. 2.0. If a copy of the MPL was not distributed
 # with this file, You can obtain one at http://mozilla.org/MPL/2.0/.
 
-from opencontainers.image.v1 import Manifest
+from opencontainers.image.v1 import Manifest, Descriptor, MediaTypeImageManifest
+from opencontainers.image.specs import Versioned
+from opencontainers.digest import Digest, FromBytes, SHA512
 from opencontainers.digest.exceptions import ErrDigestInvalidFormat
+import json
 import os
 import pytest
 
@@ -199,3 +202,122 @@ def test_manifests(tmp_path):
     # expected failure: push bounds of algorithm field in digest too far.
     with pytest.raises(ErrDigestInvalidFormat):
         manifest.load(expected_bounds_fail)
+
+
+def test_manifest_trusted(tmp_path):
+    """test creation of an opencontainers Manifest from trusted content"""
+    manifest = Manifest.from_trusted_dict(valid_with_optional)
+    assert isinstance(manifest.get("Config"), Descriptor)
+    assert isinstance(manifest.get("Config").get("Digest"), Digest)
+    assert isinstance(manifest.get("schemaVersion"), Versioned)
+    assert all(isinstance(layer, Descriptor) for layer in manifest.get("Layers"))
+
+    # The result is the same as a validated load
+    assert manifest.validate()
+    assert manifest.to_dict() == Manifest().load(valid_with_optional).to_dict()
+
+    # Nothing is checked, so invalid content is loaded as is
+    manifest = Manifest.from_trusted_dict(invalid_config_size_string)
+    assert manifest.get("Config").get("Size") == "1470"
+
+    # Unknown fields are still an error
+    with pytest.raises(SystemExit):
+        Manifest.from_trusted_dict({"notafield": 1})
+
+
+def test_manifest_digest(tmp_path):
+    """test the canonical json and digest of a Manifest"""
+    manifest = Manifest().load(valid_with_optional)
+    content = manifest.to_canonical_json()
+    assert content == json.dumps(
+        valid_with_optional, sort_keys=True, separators=(",", ":")
+    ).encode("utf-8")
+
+    # The same bytes and digest are returned until the manifest changes
+    digest = manifest.digest()
+    assert digest == FromBytes(content)
+    assert manifest.to_canonical_json() is content
+    assert manifest.digest() is digest
+    assert manifest.digest(SHA512) == SHA512.fromBytes(content)
+
+    desc = manifest.descriptor()
+    assert desc.get("MediaType") == MediaTypeImageManifest
+    assert desc.get("Digest") == digest
+    assert desc.get("Size") == len(content)
+
+    # A change to the manifest (or a nested structure) is a new digest
+    manifest.add("Annotations", {"key3": "value3"})
+    assert manifest.digest() != digest
+    digest = manifest.digest()
+    manifest.get("Config").add("Size", 1)
+    assert manifest.digest() != digest
+    assert Manifest().load(json.loads(manifest.to_canonical_json())).digest() == (
+        manifest.digest()
+    )
+
+    # Values are changed with add or evolve (changes in place aren't seen)
+    digest = manifest.digest()
+    evolved = manifest.evolve(Annotations={"key1": "changed"})
+    assert evolved.digest() != digest and manifest.digest() is digest
+    content = evolved.to_canonical_json()
+    assert evolved.digest() == FromBytes(content)
+    assert evolved.descriptor().get("Size") == len(content)
+
+
+def test_manifest_raw(tmp_path):
+    """test a Manifest keeps the bytes it was loaded from"""
+    content = json.dumps(valid_with_optional, indent=2).encode("utf-8")
+    manifest = Manifest.from_json(content)
+    assert manifest.raw == content
+    assert manifest.raw_digest() == FromBytes(content)
+
+    # The digest and descriptor are for the original bytes, not canonical json
+    assert manifest.digest() == FromBytes(content)
+    assert manifest.digest() != FromBytes(manifest.to_canonical_json())
+    assert manifest.descriptor().get("Size") == len(content)
+
+    # Once changed, the original bytes no longer describe the manifest
+    manifest.get("Layers")[0].add("Size", 1)
+    assert manifest.raw is None and manifest.raw_digest() is None
+    assert manifest.digest() == FromBytes(manifest.to_canonical_json())
+
+    # Nothing is kept without validation, or for a string
+    assert Manifest.from_json(content, validate=False).raw is None
+    assert Manifest.from_json(content.decode("utf-8")).raw is None
+
+
+def test_manifest_evolve(tmp_path):
+    print("Testing clone and evolve of a manifest")
+    manifest = Manifest().load(valid_with_optional)
+    layers = manifest.get("Layers")
+
+    # A clone shares nested structures, but not lists or dictionaries
+    clone = manifest.clone()
+    assert clone == manifest and clone._is_validated()
+    assert clone.get("Config") is manifest.get("Config")
+    assert clone.get("Layers") is not layers
+    assert clone.get("Layers")[0] is layers[0]
+    clone.get("Annotations")["key3"] = "value3"
+    assert "key3" not in manifest.get("Annotations")
+
+    # A variant with one layer changed
+    layer = Descriptor().load(valid_with_optional["layers"][0]).evolve(Size=42)
+    variant = manifest.evolve(Layers=layers[:-1] + [layer], Annotations=None)
+    assert variant.get("Config") is manifest.get("Config")
+    assert variant.get("Layers")[1] is layers[1]
+    assert variant.get("Layers")[2].get("Size") == 42
+    assert variant.get("Annotations") is None
+    assert not variant._is_validated() and variant.validate()
+    assert manifest.to_dict() == valid_with_optional
+    assert variant.to_dict()["layers"][2]["size"] == 42
+
+    # Nested changes, even of a frozen (hashed) manifest
+    hash(manifest)
+    config = manifest.get("Config").evolve(Size=10)
+    assert manifest.evolve(Config=config).get("Config").get("Size") == 10
+    assert manifest.get("Config").get("Size") == 1470
+
+    with pytest.raises(SystemExit):
+        manifest.evolve(Color="blue")
+    with pytest.raises(SystemExit):
+        manifest.evolve(Layers="one")
@@ -0,0 +1,65 @@
+#!/usr/bin/python
+
+# Copyright (C) 2019-2022 Vanessa Sochat.
+
+# This Source Code Form is subject to the terms of the
+# Mozilla Public License, v. 2.0. If a copy of the MPL was not distributed
+# with this file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+from opencontainers.image.v1 import Index, Manifest, Descriptor
+from opencontainers.image.v1.stream import iter_descriptors
+from opencontainers.tests.test_imageindex import index_with_optional
+from opencontainers.tests.test_manifest import valid_with_optional
+import io
+import json
+import pytest
+
+
+def test_stream_index(tmp_path):
+    print("Testing streaming the manifests of an index")
+    content = json.dumps(index_with_optional, indent=4).encode("utf-8")
+    expected = Index().load(index_with_optional).get("Manifests")
+
+    # From a file, with chunks small enough to split values
+    for chunk_size in [1, 7, 65536]:
+        fields = {}
+        descriptors = list(
+            iter_descriptors(io.BytesIO(content), fields=fields, chunk_size=chunk_size)
+        )
+        assert descriptors == expected
+        assert all(isinstance(d, Descriptor) and d._is_validated() for d in descriptors)
+        assert fields == {
+            "schemaVersion": 2,
+            "annotations": index_with_optional["annotations"],
+        }
+
+    # From an iterable of chunks (e.g., an http response), without validation
+    chunks = [content[i : i + 5] for i in range(0, len(content), 5)]
+    descriptors = list(iter_descriptors(iter(chunks), validate=False))
+    assert descriptors == expected and not descriptors[0]._is_validated()
+
+
+def test_stream_manifest(tmp_path):
+    print("Testing streaming the layers of a manifest")
+    content = json.dumps(valid_with_optional)
+    expected = Manifest().load(valid_with_optional).get("Layers")
+    assert list(iter_descriptors(content, keys="layers")) == expected
+    assert list(iter_descriptors(b'{"layers": []}')) == []
+    assert list(iter_descriptors(b"{}")) == []
+
+    # Invalid json, and invalid descriptors
+    for invalid in [
+        content[:-20],
+        content + "garbage",
+        b'{"schemaVersion": 2}garbage',
+        b"{} {}",
+        b'{"a": 2,}',
+        b'{"a": tru}',
+    ]:
+        with pytest.raises(SystemExit):
+            list(iter_descriptors(invalid))
+    assert list(iter_descriptors(b'{"layers": []}\n  ')) == []
+    with pytest.raises(SystemExit):
+        list(iter_descriptors(b"[]"))
+    with pytest.raises(SystemExit):
+        list(iter_descriptors(b'{"layers": [{"size": "big"}]}'))
@@ -129,3 +129,159 @@ def test_add(tmp_path):
         ).to_dict()
         == t.to_dict()
     )
+
+
+def test_schema(tmp_path):
+    """Attributes are compiled once per class and shared by instances"""
+    first = StructTest()
+    second = StructTest(Dict={"a": "b"}, List=[1])
+    assert first._schema is second._schema is StructTest._schema
+    assert first._schema.json["AnotherList"].child is AnotherStruct
+
+    # Values (including list defaults) belong to the instance
+    assert first.get("Dict") is None
+    assert first.get("AnotherList") == []
+    assert first.get("AnotherList") is not second.get("AnotherList")
+    assert second.to_dict()["Dict"] == {"a": "b"}
+
+    # attrs still provides the attribute with its value
+    assert second.attrs["List"].value == [1]
+    assert second.attrs["List"].jsonName == "List"
+
+    # An instance that declares something different gets its own schema
+    third = StructTest()
+    third.newAttr(name="Extra", attType=str)
+    third.add("Extra", "value")
+    assert third._schema is not StructTest._schema
+    assert "Extra" not in StructTest._schema.attrs
+    assert third.to_dict()["Extra"] == "value"
+
+
+def test_schema_sealed_after_first(tmp_path):
+    """An attribute added to the first instance isn't added to the class"""
+
+    class FirstStruct(Struct):
+        def __init__(self):
+            super().__init__()
+            self.newAttr("Attr", attType=str)
+
+    first = FirstStruct()
+    first.newAttr(name="Extra", attType=str)
+    assert "Extra" in first._schema.attrs
+    assert "Extra" not in FirstStruct._schema.attrs
+    assert "Extra" not in FirstStruct()._schema.attrs
+    with pytest.raises(SystemExit):
+        FirstStruct().load({"Extra": "value"})
+
+
+class CountedStruct(Struct):
+    validations = 0
+
+    def __init__(self, Attr=None, Children=None):
+        super().__init__()
+
+        self.newAttr("Attr", attType=StrStruct)
+        self.newAttr("Children", attType=[CountedStruct])
+
+        self.add("Attr", Attr)
+        self.add("Children", Children)
+
+    def _validate(self):
+        CountedStruct.validations += 1
+        return True
+
+
+def test_validate_once(tmp_path):
+    """Structures are only validated again after a change"""
+    CountedStruct.validations = 0
+    parent = CountedStruct().load({"Attr": "parent", "Children": [{"Attr": "child"}]})
+    assert CountedStruct.validations == 2
+
+    # Unchanged, so nothing is validated again
+    parent.validate()
+    parent.to_dict()
+    parent.to_json()
+    assert CountedStruct.validations == 2
+
+    # A change to a child validates the child and the parent (once)
+    child = parent.get("Children")[0]
+    child.add("Attr", "more")
+    assert parent.to_dict()["Children"] == [{"Attr": "childmore"}]
+    parent.to_dict()
+    assert CountedStruct.validations == 4
+
+    # A change to the parent only validates the parent
+    parent.add("Attr", "more")
+    assert parent.to_dict()["Attr"] == "parentmore"
+    assert CountedStruct.validations == 5
+
+    # Setting a value with attrs is also a change
+    parent.attrs["Attr"].value = StrStruct("other")
+    parent.validate()
+    assert CountedStruct.validations == 6
+
+    # A change two levels down validates every structure above it
+    parent.get("Children")[0].add("Children", [{"Attr": "grandchild"}])
+    parent.validate()
+    assert CountedStruct.validations == 9
+    grandchild = parent.get("Children")[0].get("Children")[0]
+    grandchild.attrs["Attr"].value = None
+    assert parent._is_validated() is False
+    parent.validate()
+    assert CountedStruct.validations == 12
+
+
+def test_pickle(tmp_path):
+    print("Testing pickling structures as their values")
+    import pickle
+    from opencontainers.image.v1 import Manifest
+    from opencontainers.digest import Digest, SHA256
+    from opencontainers.image.specs import Versioned
+
+    manifest = Manifest().load(
+        {
+            "schemaVersion": 2,
+            "config": {
+                "mediaType": "application/vnd.oci.image.config.v1+json",
+                "size": 7023,
+                "digest": "sha256:b5b2b2c507a0944348e0303114d8d93aaaa081732b86451d9bce1f432a537bc7",
+            },
+            "layers": [
+                {
+                    "mediaType": "application/vnd.oci.image.layer.v1.tar+gzip",
+                    "size": 32654,
+                    "digest": "sha256:9834876dcfb05cb167a5c24953eba58c4ac89b1adf57f28f2f9d09af107ee8f0",
+                }
+            ],
+        }
+    )
+    copied = pickle.loads(pickle.dumps(manifest))
+    assert copied == manifest
+    assert copied.to_dict() == manifest.to_dict()
+
+    # A valid structure stays valid, and isn't validated again
+    assert copied._is_validated()
+    assert copied.get("Config")._validated < copied._validated
+
+    # String and integer structures are pickled as their value
+    for value in [Digest(manifest.get("Config").get("Digest")), SHA256, Versioned(2)]:
+        restored = pickle.loads(pickle.dumps(value))
+        assert type(restored) is type(value) and restored == value
+
+    # A copy doesn't share values with the original
+    struct = StructTest(Dict={"a": 1}, Str="b")
+    copied = pickle.loads(pickle.dumps(struct))
+    assert copied == struct and not copied._is_validated()
+    copied.add("Int", 1)
+    assert struct.get("Int") is None
+
+    # Other attributes are kept, e.g., the hash of a resumable digester
+    from opencontainers.digest.resumable import resumableDigester
+
+    digester = resumableDigester()
+    digester.write(b"hello ")
+    copied = pickle.loads(pickle.dumps(digester))
+    assert copied.alg == SHA256 and copied.offset == 6
+    copied.write(b"world")
+    digester.write(b"world")
+    assert copied.digest() == digester.digest()
@@ -0,0 +1,81 @@
+#!/usr/bin/python
+
+# Copyright (C) 2019-2022 Vanessa Sochat.
+
+# This Source Code Form is subject to the terms of the
+# Mozilla Public License, v. 2.0. If a copy of the MPL was not distributed
+# with this file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+from opencontainers.image.v1 import table as descriptor_table
+from opencontainers.image.v1.table import DescriptorTable
+from opencontainers.tests.test_imageindex import index_with_optional
+from opencontainers.tests.test_manifest import valid_with_optional
+import json
+import pytest
+
+layer = "application/vnd.oci.image.layer.v1.tar+gzip"
+config = "application/vnd.oci.image.config.v1+json"
+index = "application/vnd.oci.image.manifest.v1+json"
+
+
+@pytest.fixture(params=["python", "numpy"])
+def table(request, monkeypatch):
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(descriptor_table, "numpy", None)
+
+    table = DescriptorTable()
+    table.add(valid_with_optional, name="first")
+
+    # A second manifest shares the config and two layers, from json
+    second = dict(valid_with_optional, layers=valid_with_optional["layers"][1:])
+    second["layers"] = second["layers"] + [
+        dict(valid_with_optional["layers"][0], size=10, digest="sha256:" + "a" * 64)
+    ]
+    assert table.add(json.dumps(second).encode("utf-8"), name="second") == 1
+    table.add(index_with_optional, name="index")
+    return table
+
+
+def test_table(table):
+    print("Testing a columnar table of descriptors")
+    assert len(table) == 4 + 4 + 2
+    assert table.digest(0) == valid_with_optional["config"]["digest"]
+    assert table.media_type(1) == layer
+    assert table.name(9) == "index"
+    assert len(table.digest_values) == 4 + 1 + 2
+
+    assert table.size_by_media_type("layer") == {layer: 675598 + 156 * 2 + 148 * 2 + 10}
+    assert table.size_by_media_type() == {
+        layer: 675598 + 156 * 2 + 148 * 2 + 10,
+        config: 1470 * 2,
+        index: 7143 + 7682,
+    }
+    assert table.unique_size("layer") == 675598 + 156 + 148 + 10
+    assert table.unique_size() == 675598 + 156 + 148 + 10 + 1470 + 7143 + 7682
+
+    shared = table.shared_digests("layer")
+    assert shared == {table.digest(2): 2, table.digest(3): 2}
+    assert len(table.shared_digests()) == 3
+    assert len(table.shared_digests(minimum=1)) == 7
+
+    with pytest.raises(SystemExit):
+        table.unique_size("blob")
+    with pytest.raises(SystemExit):
+        table.add({"layers": [{"size": 1}]})
+
+
+def test_table_columns(table):
+    print("Testing the NumPy columns of a table")
+    if descriptor_table.numpy is None:
+        with pytest.raises(SystemExit):
+            table.columns()
+        return
+
+    # The columns are copies, so the table can still grow
+    columns = table.columns()
+    assert columns["sizes"].tolist() == table.sizes.tolist()
+    table.add(valid_with_optional, name="third")
+    assert len(columns["sizes"]) == 10 and len(table) == 14
+    assert table.unique_size("layer") == 675598 + 156 + 148 + 10
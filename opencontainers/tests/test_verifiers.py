@@ -21,7 +21,30 @@ def test_digest_verifier(tmp_path):
     digest = FromBytes(p)
     verifier = digest.verifier()
     verifier.write(p)
-    verifier.verified()
+    assert verifier.verified()
+    assert verifier.digest is digest
+
+
+def test_digest_verifier_chunks(tmp_path):
+    """test verifying content written in chunks, of any bytes-like type"""
+    content = bytes(range(256)) * 1024
+    digest = FromBytes(content)
+
+    verifier = digest.verifier()
+    view = memoryview(content)
+    for start in range(0, len(content), 4096):
+        verifier.write(view[start : start + 4096])
+    assert verifier.verified()
+
+    # The expected digest can't be replaced
+    with pytest.raises(AttributeError):
+        verifier.digest = FromBytes(b"")
+
+    verifier = digest.verifier()
+    verifier.write(bytearray(content[:-1]))
+    assert not verifier.verified()
+    verifier.write(content[-1:])
+    assert verifier.verified()
 
 
 def test_digest_verifier_unsupported(tmp_path):